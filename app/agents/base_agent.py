@@ -6,8 +6,9 @@ import asyncio
 import json
 import logging
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, TypedDict, Union
+from typing import Any, Dict, List, Optional, Set, TypedDict, Union
 
 from dotenv import load_dotenv
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -17,7 +18,7 @@ from langgraph.prebuilt import ToolNode
 from langsmith import Client
 
 from app.core.config import settings
-from app.core.telemetry import get_telemetry
+from app.core.telemetry import correlation_id_var, get_telemetry
 
 # Load environment variables
 load_dotenv()
@@ -57,7 +58,7 @@ class AgentState(TypedDict):
     retry_count: int
     
     start_time: datetime
-    last_update: datetime
+    last_update_ns: int
 
 
 class BaseAgent:
@@ -65,6 +66,8 @@ class BaseAgent:
     
     def __init__(self):
         self.telemetry = get_telemetry()
+        # Post-workflow cleanups still running; held so they are not garbage collected
+        self._cleanup_tasks: Set[asyncio.Task] = set()
         
         # Initialize LangSmith client and configure tracing directly from .env
         langsmith_api_key = os.getenv("LANGSMITH_API_KEY")
@@ -80,7 +83,7 @@ class BaseAgent:
             os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGSMITH_PROJECT", "backspace-agent")
             os.environ["LANGCHAIN_ENDPOINT"] = os.getenv("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com")
             
-            logger.info(f"LangSmith tracing enabled for project: {os.getenv('LANGSMITH_PROJECT', 'backspace-agent')}")
+            logger.info("LangSmith tracing enabled for project: %s", os.getenv('LANGSMITH_PROJECT', 'backspace-agent'))
         else:
             self.langsmith_client = None
             logger.info("LangSmith tracing disabled - no API key provided")
@@ -98,8 +101,7 @@ class BaseAgent:
         workflow.add_node("analyze_repository", self._analyze_repository_node)
         workflow.add_node("create_plan", self._create_plan_node)
         workflow.add_node("implement_changes", self._implement_changes_node)
-        workflow.add_node("commit_changes", self._commit_changes_node)
-        workflow.add_node("push_changes", self._push_changes_node)
+        workflow.add_node("commit_and_push", self._commit_and_push_node)
         workflow.add_node("create_pull_request", self._create_pull_request_node)
         workflow.add_node("handle_error", self._handle_error_node)
         
@@ -129,22 +131,13 @@ class BaseAgent:
             "implement_changes",
             self._should_continue,
             {
-                "continue": "commit_changes",
+                "continue": "commit_and_push",
                 "error": "handle_error"
             }
         )
         
         workflow.add_conditional_edges(
-            "commit_changes",
-            self._should_continue,
-            {
-                "continue": "push_changes",
-                "error": "handle_error"
-            }
-        )
-        
-        workflow.add_conditional_edges(
-            "push_changes",
+            "commit_and_push",
             self._should_continue,
             {
                 "continue": "create_pull_request",
@@ -178,7 +171,7 @@ class BaseAgent:
             self._log_node_start("analyze_repository", state)
             
             state["current_step"] = "analyze_repository"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             state["steps_completed"].append("analyze_repository")
             self._log_node_success("analyze_repository", state)
@@ -194,7 +187,7 @@ class BaseAgent:
             self._log_node_start("create_plan", state)
             
             state["current_step"] = "create_plan"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             state["steps_completed"].append("create_plan")
             self._log_node_success("create_plan", state)
@@ -210,7 +203,7 @@ class BaseAgent:
             self._log_node_start("implement_changes", state)
             
             state["current_step"] = "implement_changes"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             state["steps_completed"].append("implement_changes")
             self._log_node_success("implement_changes", state)
@@ -226,7 +219,7 @@ class BaseAgent:
             self._log_node_start("commit_changes", state)
             
             state["current_step"] = "commit_changes"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             state["steps_completed"].append("commit_changes")
             self._log_node_success("commit_changes", state)
@@ -242,7 +235,7 @@ class BaseAgent:
             self._log_node_start("push_changes", state)
             
             state["current_step"] = "push_changes"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             state["steps_completed"].append("push_changes")
             self._log_node_success("push_changes", state)
@@ -252,13 +245,20 @@ class BaseAgent:
             
         return state
     
+    async def _commit_and_push_node(self, state: AgentState) -> AgentState:
+        """Commit the changes and push them to the remote repository."""
+        state = await self._commit_changes_node(state)
+        if not state["errors"]:
+            state = await self._push_changes_node(state)
+        return state
+    
     async def _create_pull_request_node(self, state: AgentState) -> AgentState:
         """Create a pull request."""
         try:
             self._log_node_start("create_pull_request", state)
             
             state["current_step"] = "create_pull_request"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             state["steps_completed"].append("create_pull_request")
             self._log_node_success("create_pull_request", state)
@@ -274,17 +274,17 @@ class BaseAgent:
             self._log_node_start("handle_error", state)
             
             state["current_step"] = "handle_error"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             if state["errors"]:
                 latest_error = state["errors"][-1]
-                logger.error(f"Agent error: {latest_error}")
+                logger.error("Agent error: %s", latest_error)
                 
                 state["retry_count"] += 1
                 
                 if state["retry_count"] < 3:
                     state["errors"] = []
-                    logger.info(f"Retrying operation (attempt {state['retry_count']})")
+                    logger.info("Retrying operation (attempt %s)", state['retry_count'])
                 else:
                     logger.error("Max retries exceeded")
             
@@ -292,7 +292,7 @@ class BaseAgent:
             self._log_node_success("handle_error", state)
             
         except Exception as e:
-            logger.error(f"Error in error handler: {e}")
+            logger.error("Error in error handler: %s", e)
             
         return state
     
@@ -318,7 +318,7 @@ class BaseAgent:
         }
         
         state["errors"].append(error_info)
-        state["last_update"] = datetime.utcnow()
+        state["last_update_ns"] = time.monotonic_ns()
         
         self._log_node_error(node_name, state, error)
         
@@ -326,6 +326,7 @@ class BaseAgent:
     
     def _log_node_start(self, node_name: str, state: AgentState):
         """Log the start of a node execution."""
+        correlation_id_var.set(state["correlation_id"])
         self.telemetry.log_event(
             f"Node started: {node_name}",
             correlation_id=state["correlation_id"],
@@ -389,7 +390,7 @@ class BaseAgent:
             errors=[],
             retry_count=0,
             start_time=datetime.utcnow(),
-            last_update=datetime.utcnow()
+            last_update_ns=time.monotonic_ns()
         )
         
         self.telemetry.log_event(
@@ -411,15 +412,8 @@ class BaseAgent:
                 errors_count=len(final_state["errors"])
             )
             
-            # Cleanup sandbox container after workflow completion
-            try:
-                await self.cleanup(correlation_id)
-            except Exception as cleanup_error:
-                self.telemetry.log_error(
-                    cleanup_error,
-                    context={"correlation_id": correlation_id, "operation": "post_workflow_cleanup"},
-                    correlation_id=correlation_id
-                )
+            # Cleanup sandbox container after workflow completion, off the result path
+            self._schedule_cleanup(correlation_id, "post_workflow_cleanup")
             
             return {
                 "success": len(final_state["errors"]) == 0,
@@ -436,14 +430,7 @@ class BaseAgent:
             )
             
             # Cleanup sandbox container even if workflow failed
-            try:
-                await self.cleanup(correlation_id)
-            except Exception as cleanup_error:
-                self.telemetry.log_error(
-                    cleanup_error,
-                    context={"correlation_id": correlation_id, "operation": "error_cleanup"},
-                    correlation_id=correlation_id
-                )
+            self._schedule_cleanup(correlation_id, "error_cleanup")
             
             return {
                 "success": False,
@@ -451,6 +438,35 @@ class BaseAgent:
                 "error": str(e)
             }
     
+    def _schedule_cleanup(self, correlation_id: str, operation: str) -> None:
+        """
+        Run cleanup() for a finished workflow in the background.
+        
+        Stopping and removing the sandbox container can take seconds, so the
+        workflow result is returned without waiting for it.
+        
+        Args:
+            correlation_id: Workflow whose resources should be released
+            operation: Label recorded if the cleanup fails
+        """
+        def _on_done(task: asyncio.Task) -> None:
+            self._cleanup_tasks.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                self.telemetry.log_error(
+                    task.exception(),
+                    context={"correlation_id": correlation_id, "operation": operation},
+                    correlation_id=correlation_id
+                )
+        
+        task = asyncio.create_task(self.cleanup(correlation_id))
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(_on_done)
+    
+    async def wait_for_cleanup(self) -> None:
+        """Wait for background workflow cleanups to finish (e.g. before the event loop closes)."""
+        if self._cleanup_tasks:
+            await asyncio.gather(*self._cleanup_tasks, return_exceptions=True)
+    
     def _print_graph_diagram(self):
         """Print the compiled LangGraph diagram."""
         try:
@@ -467,7 +483,7 @@ class BaseAgent:
             print("="*80 + "\n")
             
         except Exception as e:
-            logger.warning(f"Could not display graph diagram: {e}")
+            logger.warning("Could not display graph diagram: %s", e)
             print("\n" + "="*80)
             print("🔗 LANGGRAPH WORKFLOW COMPILED")
             print("="*80)
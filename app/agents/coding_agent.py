@@ -6,10 +6,11 @@ import asyncio
 import json
 import logging
 import os
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Dict, Optional
 import time
 
+from jinja2 import BaseLoader, Environment
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_openai import ChatOpenAI
@@ -21,24 +22,99 @@ from app.agents.tools import create_toolkit
 from app.services.sandbox import SandboxService
 from app.services.git_service import GitService
 from app.core.config import settings
-from app.core.telemetry import get_telemetry
+from app.core.telemetry import correlation_id_var, get_telemetry
 from pydantic import PrivateAttr
 
 logger = logging.getLogger(__name__)
 
+# First word of a change's action -> PR "Files Changed" bucket
+_CHANGE_ACTION_BUCKETS = {
+    'created': 'created',
+    'create': 'created',
+    'modified': 'modified',
+    'modify': 'modified',
+    'updated': 'modified',
+    'update': 'modified',
+}
+
+# Pull request description; rendered with trim_blocks so block tags do not leave blank lines
+PR_BODY_TEMPLATE = """## 🎯 Task
+{{ prompt }}
+
+## 🚀 What Was Done
+{% for item in done_items %}
+• {{ item }}
+{% else %}
+• Implemented requested changes
+{% endfor %}
+
+## 📁 Files Changed
+{% if files_created %}
+**Files Created:**
+{% for file_path in files_created %}
+• {{ file_path }}
+{% endfor %}
+
+{% endif %}
+{% if files_modified %}
+**Files Modified:**
+{% for file_path in files_modified %}
+• {{ file_path }}
+{% endfor %}
+
+{% endif %}
+{% if not files_created and not files_modified %}
+• No specific files detected
+
+{% endif %}
+---
+*This pull request was automatically created by **Backspace AI Coding Agent***"""
+
+_PR_ENV = Environment(loader=BaseLoader(), trim_blocks=True, autoescape=False)
+_PR_BODY_TEMPLATE = _PR_ENV.from_string(PR_BODY_TEMPLATE)
+
+# Shared across agent instances so concurrent requests cannot fan out unbounded git subprocesses
+_GIT_CONCURRENCY = max(1, (os.cpu_count() or 2) * 3 // 4)
+_git_semaphore = asyncio.Semaphore(_GIT_CONCURRENCY)
+
+
+# Characters stripped from LLM-generated branch names (applied after lowercasing)
+_BRANCH_INVALID_CHARS_RE = re.compile(r'[^a-z0-9\-/]')
+_BRANCH_TYPE_PREFIXES = ('feature/', 'fix/', 'add/', 'update/', 'improve/')
+
+# Entry-point file names recognised when describing a change, matched anywhere in the lowercase path
+_JS_ENTRY_FILE_RE = re.compile(r'app\.|main\.|index\.')
+_PY_ENTRY_FILE_RE = re.compile(r'app\.py|main\.py|__init__\.py')
+
+# Prompt topics for change descriptions. The lookahead makes every position a candidate so
+# overlapping keywords are all reported, matching plain substring tests; lastgroup names the topic.
+_PROMPT_TOPIC_RE = re.compile(
+    r'(?=(?P<signup>sign ?up)|(?P<login>login)|(?P<contact>contact)|(?P<button>button)'
+    r'|(?P<nav>nav|menu)|(?P<footer>footer)|(?P<header>header)|(?P<form>form)'
+    r'|(?P<modal>modal|popup)|(?P<auth>auth)|(?P<user>user))'
+)
+
+# Tools only the workflow nodes call; never offered to (or run for) the implementation LLM
+_WORKFLOW_ONLY_TOOLS = frozenset({"commit_and_push"})
+
 
 class CodingAgent(BaseAgent):
     """Concrete implementation of the coding agent."""
     
-    def __init__(self, streaming_service=None):
+    def __init__(self, streaming_service=None, sandbox_service: Optional[SandboxService] = None):
         super().__init__()
         
         self.streaming_service = streaming_service
-        self.sandbox_service = SandboxService()
+        # Share the application's sandbox service (one Docker client) when one is provided
+        self.sandbox_service = sandbox_service or SandboxService()
         self.git_service = GitService()
         
         self.tools = create_toolkit(self.sandbox_service, self.git_service)
         
+        # correlation_id -> branch already created for it, reused across retries
+        self._branch_cache: Dict[str, str] = {}
+        self._git_sem = _git_semaphore
+        
         self.llm = self._initialize_llm()
         
         self.system_prompt = self._create_system_prompt()
@@ -62,8 +138,10 @@ class CodingAgent(BaseAgent):
         else:
             raise ValueError(f"Unsupported AI provider: {settings.ai_provider}")
     
-    async def _send_streaming_update(self, correlation_id: str, message: str, progress: int = None, step: str = None):
+    async def _send_streaming_update(self, correlation_id: Optional[str], message: str, progress: int = None, step: str = None):
         """Send a streaming update using the streaming service if available."""
+        # Nodes bind their correlation ID on entry, so callers may pass None
+        correlation_id = correlation_id or correlation_id_var.get()
         if self.streaming_service:
             try:
                 # Use the appropriate streaming service method
@@ -97,7 +175,53 @@ class CodingAgent(BaseAgent):
             )
         
         # Always log for debugging
-        logger.info(f"[{correlation_id}] {message} (progress: {progress}%, step: {step})")
+        logger.info("[%s] %s (progress: %s%%, step: %s)", correlation_id, message, progress, step)
+    
+    async def _send_tool_update(
+        self,
+        correlation_id: Optional[str],
+        tool_type: str,
+        filepath: Optional[str] = None,
+        output: Optional[str] = None
+    ):
+        """Send a tool event using the streaming service if available."""
+        if not self.streaming_service:
+            return
+        correlation_id = correlation_id or correlation_id_var.get()
+        try:
+            await self.streaming_service.send_tool_event(
+                correlation_id=correlation_id,
+                tool_type=tool_type,
+                filepath=filepath,
+                output=output
+            )
+        except Exception as e:
+            self.telemetry.log_error(
+                e,
+                context={"tool_update": tool_type, "filepath": filepath, "correlation_id": correlation_id},
+                correlation_id=correlation_id
+            )
+    
+    async def _get_cached_branch(self, state: AgentState) -> Optional[str]:
+        """Return the branch already created for this correlation_id if it still exists in the repo."""
+        branch_name = self._branch_cache.get(state["correlation_id"])
+        if not branch_name:
+            return None
+        
+        # Always validate against the repository before trusting the cache
+        async with self._git_sem:
+            branch_exists = await self.git_service.checkout_existing_branch(
+                correlation_id=state["correlation_id"],
+                repo_path=state["repo_path"],
+                branch_name=branch_name,
+                sandbox_service=self.sandbox_service
+            )
+        
+        if branch_exists:
+            return branch_name
+        
+        del self._branch_cache[state["correlation_id"]]
+        return None
     
     def _create_system_prompt(self) -> str:
         """Create the system prompt for the agent."""
@@ -287,7 +411,7 @@ class CodingAgent(BaseAgent):
             )
             
             state["current_step"] = "analyze_repository"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
 
             await self.sandbox_service.create_sandbox(
                 correlation_id=state["correlation_id"]
@@ -353,7 +477,7 @@ class CodingAgent(BaseAgent):
             )
             
             state["current_step"] = "create_plan"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             await self._send_streaming_update(
                 state["correlation_id"], 
@@ -369,9 +493,22 @@ class CodingAgent(BaseAgent):
                 chat_history=state["messages"]
             )
             
-            response = await self.llm.ainvoke(prompt)
-            
-            plan = self._parse_plan(response.content)
+            # The branch only depends on the prompt, so name and create it while the plan is generated
+            branch_task = asyncio.create_task(self._prepare_branch(state))
+            try:
+                response = await self.llm.ainvoke(prompt)
+                
+                plan = self._parse_plan(response.content)
+            finally:
+                try:
+                    await branch_task
+                except Exception as branch_error:
+                    # implement_changes creates the branch itself if this early attempt failed
+                    self.telemetry.log_error(
+                        branch_error,
+                        context={"step": "create_plan", "operation": "prepare_branch"},
+                        correlation_id=state["correlation_id"]
+                    )
             
             state["plan"] = plan
             state["messages"].append(response)
@@ -404,78 +541,26 @@ class CodingAgent(BaseAgent):
                 raise ValueError("correlation_id missing in state at implement_changes_node")
             self._log_node_start("implement_changes", state)
             
-            # Send initial streaming update
-            await self._send_streaming_update(
-                state["correlation_id"], 
-                "⚒️ Implementing changes...", 
-                progress=50, 
-                step="Implementing Changes"
-            )
-            
             state["current_step"] = "implement_changes"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
-            # Create branch first
             await self._send_streaming_update(
                 state["correlation_id"], 
-                "🌿 Creating feature branch...", 
+                "⚒️ Implementing changes...", 
                 progress=52, 
-                step="Creating Branch"
+                step="Implementing Changes"
             )
             
-            create_branch_tool = next(t for t in self.tools if t.name == "create_branch")
-            
-            # Create branch name
-            branch_prompt = f"""Based on the following task description, generate a concise and descriptive branch name that follows git branch naming conventions.
-
-Task: {state['prompt']}
-
-Requirements:
-- Use kebab-case (lowercase with hyphens)
-- Be descriptive but concise (max 50 characters)
-- Start with a type prefix like 'feature/', 'fix/', 'add/', etc.
-- Avoid special characters except hyphens
-- Make it clear what the branch is for
-
-Examples:
-- "Add contact form" → "feature/add-contact-form"
-- "Fix navigation bug" → "fix/navigation-bug"
-- "Update styling" → "feature/update-styling"
-
-Branch name:"""
-            
-            branch_response = await self.llm.ainvoke(branch_prompt)
-            base_branch_name = branch_response.content.strip()
-            
-            import re
-            base_branch_name = re.sub(r'[^a-zA-Z0-9\-/]', '', base_branch_name)
-            base_branch_name = base_branch_name.lower()
-            
-            if not any(base_branch_name.startswith(prefix) for prefix in ['feature/', 'fix/', 'add/', 'update/', 'improve/']):
-                base_branch_name = f"feature/{base_branch_name}"
-            
-            branch_name = f"{base_branch_name}-{int(time.time())}"
-            
-            await create_branch_tool.ainvoke({
-                "correlation_id": state["correlation_id"],
-                "repo_path": state["repo_path"],
-                "branch_name": branch_name
-            })
+            # Normally created during create_plan; this only creates it if that early attempt failed
+            branch_name = await self._prepare_branch(state)
             
             state["branch_name"] = branch_name
             
             await self._send_streaming_update(
                 state["correlation_id"], 
-                f"✅ Branch created: {branch_name}", 
-                progress=55, 
-                step="Branch Created"
-            )
-            
-            await self._send_streaming_update(
-                state["correlation_id"], 
-                "📝 Writing code changes...", 
+                f"🌿 Using feature branch {branch_name} - 📝 writing code changes...", 
                 progress=60, 
-                step="Writing Code"
+                step=f"Branch {branch_name}: Writing Code"
             )
             
             # Create a simple prompt for the LLM to use tools directly
@@ -544,13 +629,20 @@ Start by reading dependency files, then read the main application files, then cr
 
             # Use the LLM with tool calling in a conversation loop
             messages = [
-                SystemMessage(content="You are a coding agent that implements changes by using tools. You have access to read_file, write_file, and execute_command tools. Use them to implement the requested changes."),
+                SystemMessage(content="You are a coding agent that implements changes by using tools. You have access to read_file, read_files (several files at once), write_file, and execute_command tools. Use them to implement the requested changes."),
                 HumanMessage(content=implementation_prompt)
             ]
             
             print(f"\n===== BACKSPACE DEBUG: Starting Implementation Loop =====")
             
             changes_made = []
+            # Paths the LLM has read so far; a later write to one of them modifies an existing file
+            read_file_paths = set()
+            # Prompt keywords used to describe each written file; the prompt is fixed for the whole loop
+            prompt_topics = {m.lastgroup for m in _PROMPT_TOPIC_RE.finditer(state.get('prompt', '').lower())}
+            # Committing and pushing is the commit_and_push node's job, not the implementation loop's
+            llm_tools = [t for t in self.tools if t.name not in _WORKFLOW_ONLY_TOOLS]
+            llm_with_tools = self.llm.bind_tools(llm_tools)
             max_iterations = 10  # Prevent infinite loops
             iteration = 0
             
@@ -568,7 +660,7 @@ Start by reading dependency files, then read the main application files, then cr
                 )
                 
                 # Get the LLM response with tool calling
-                response = await self.llm.bind_tools(self.tools).ainvoke(messages)
+                response = await llm_with_tools.ainvoke(messages)
                 
                 print(f"Response: {response}")
                 print(f"Tool calls: {response.tool_calls if hasattr(response, 'tool_calls') else 'No tool calls'}")
@@ -576,6 +668,12 @@ Start by reading dependency files, then read the main application files, then cr
                 # Add the response to messages
                 messages.append(response)
                 
+                for tool_call in getattr(response, 'tool_calls', None) or ():
+                    if tool_call.get('name') == 'read_file':
+                        read_file_paths.add(tool_call.get('args', {}).get('file_path'))
+                    elif tool_call.get('name') == 'read_files':
+                        read_file_paths.update(tool_call.get('args', {}).get('file_paths') or ())
+                
                 # Check if LLM made tool calls
                 if hasattr(response, 'tool_calls') and response.tool_calls:
                     tool_results = []
@@ -586,7 +684,7 @@ Start by reading dependency files, then read the main application files, then cr
                         print(f"Args: {tool_call['args']}")
                         
                         # Find the tool
-                        tool = next((t for t in self.tools if t.name == tool_call['name']), None)
+                        tool = next((t for t in llm_tools if t.name == tool_call['name']), None)
                         if tool:
                             try:
                                 # Add correlation_id and repo_path to args if not present
@@ -596,7 +694,7 @@ Start by reading dependency files, then read the main application files, then cr
                                 else:
                                     # Override the correlation_id from LLM with the correct one
                                     tool_args['correlation_id'] = state["correlation_id"]
-                                if 'repo_path' not in tool_args and tool_call['name'] in ['read_file', 'write_file']:
+                                if 'repo_path' not in tool_args and tool_call['name'] in ['read_file', 'read_files', 'write_file']:
                                     tool_args['repo_path'] = state["repo_path"]
                                 
                                 result = await tool.ainvoke(tool_args)
@@ -607,62 +705,44 @@ Start by reading dependency files, then read the main application files, then cr
                                     file_path = tool_args.get('file_path', 'unknown')
                                     
                                     # Check if this file was read before (indicates it existed)
-                                    file_existed = False
-                                    
-                                    # Check current tool calls for read_file
-                                    if hasattr(response, 'tool_calls') and response.tool_calls:
-                                        for prev_tool_call in response.tool_calls:
-                                            if (prev_tool_call.get('name') == 'read_file' and 
-                                                prev_tool_call.get('args', {}).get('file_path') == file_path):
-                                                file_existed = True
-                                                break
-                                    
-                                    # Also check previous iterations for read_file calls
-                                    if not file_existed:
-                                        for msg in messages:
-                                            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                                                for prev_tool_call in msg.tool_calls:
-                                                    if (prev_tool_call.get('name') == 'read_file' and 
-                                                        prev_tool_call.get('args', {}).get('file_path') == file_path):
-                                                        file_existed = True
-                                                        break
+                                    file_existed = file_path in read_file_paths
                                     
                                     # Generate descriptive text based on the original prompt and file type
-                                    prompt_lower = state.get('prompt', '').lower()
+                                    path_lower = file_path.lower()
                                     
                                     # Determine file type and generate appropriate description
                                     if file_path.endswith(('.jsx', '.js', '.ts', '.tsx')):
                                         # JavaScript/TypeScript/React files
-                                        if 'component' in file_path.lower() and not file_existed:
+                                        if 'component' in path_lower and not file_existed:
                                             # Infer component type from prompt
-                                            if 'sign up' in prompt_lower or 'signup' in prompt_lower:
+                                            if 'signup' in prompt_topics:
                                                 description = f"Added new SignUp component with user registration form"
-                                            elif 'login' in prompt_lower:
+                                            elif 'login' in prompt_topics:
                                                 description = f"Added new Login component with authentication form"
-                                            elif 'contact' in prompt_lower:
+                                            elif 'contact' in prompt_topics:
                                                 description = f"Added new Contact component with contact form"
-                                            elif 'button' in prompt_lower:
+                                            elif 'button' in prompt_topics:
                                                 description = f"Added new interactive button component"
-                                            elif 'nav' in prompt_lower or 'menu' in prompt_lower:
+                                            elif 'nav' in prompt_topics:
                                                 description = f"Added new navigation component"
-                                            elif 'footer' in prompt_lower:
+                                            elif 'footer' in prompt_topics:
                                                 description = f"Added new footer component"
-                                            elif 'header' in prompt_lower:
+                                            elif 'header' in prompt_topics:
                                                 description = f"Added new header component"
-                                            elif 'form' in prompt_lower:
+                                            elif 'form' in prompt_topics:
                                                 description = f"Added new form component"
-                                            elif 'modal' in prompt_lower or 'popup' in prompt_lower:
+                                            elif 'modal' in prompt_topics:
                                                 description = f"Added new modal/popup component"
                                             else:
-                                                component_name = file_path.split('/')[-1].replace('.jsx', '').replace('.js', '').replace('.tsx', '').replace('.ts', '')
+                                                component_name = os.path.splitext(file_path[file_path.rfind('/') + 1:])[0]
                                                 description = f"Added new {component_name} component"
-                                        elif any(main_file in file_path.lower() for main_file in ['app.', 'main.', 'index.']) and file_existed:
+                                        elif _JS_ENTRY_FILE_RE.search(path_lower) and file_existed:
                                             # Main application files
-                                            if 'sign up' in prompt_lower or 'signup' in prompt_lower:
+                                            if 'signup' in prompt_topics:
                                                 description = f"Integrated SignUp functionality into main application"
-                                            elif 'login' in prompt_lower:
+                                            elif 'login' in prompt_topics:
                                                 description = f"Integrated Login functionality into main application"
-                                            elif 'contact' in prompt_lower:
+                                            elif 'contact' in prompt_topics:
                                                 description = f"Integrated Contact form into main application"
                                             else:
                                                 description = f"Enhanced main application with new functionality"
@@ -675,27 +755,27 @@ Start by reading dependency files, then read the main application files, then cr
                                     
                                     elif file_path.endswith('.py'):
                                         # Python files
-                                        if 'api' in file_path.lower() or 'endpoint' in file_path.lower() or 'route' in file_path.lower():
-                                            if 'auth' in prompt_lower or 'login' in prompt_lower:
+                                        if 'api' in path_lower or 'endpoint' in path_lower or 'route' in path_lower:
+                                            if 'auth' in prompt_topics or 'login' in prompt_topics:
                                                 description = f"Added authentication API endpoints"
-                                            elif 'user' in prompt_lower:
+                                            elif 'user' in prompt_topics:
                                                 description = f"Added user management API endpoints"
-                                            elif 'contact' in prompt_lower:
+                                            elif 'contact' in prompt_topics:
                                                 description = f"Added contact form API endpoint"
                                             else:
                                                 description = f"Added new API endpoint functionality"
-                                        elif 'model' in file_path.lower():
-                                            if 'user' in prompt_lower:
+                                        elif 'model' in path_lower:
+                                            if 'user' in prompt_topics:
                                                 description = f"Added User data model"
-                                            elif 'auth' in prompt_lower:
+                                            elif 'auth' in prompt_topics:
                                                 description = f"Added authentication data model"
                                             else:
                                                 description = f"Added new data model"
-                                        elif 'service' in file_path.lower():
+                                        elif 'service' in path_lower:
                                             description = f"Added new service functionality"
-                                        elif 'test' in file_path.lower():
+                                        elif 'test' in path_lower:
                                             description = f"Added test cases"
-                                        elif any(main_file in file_path.lower() for main_file in ['app.py', 'main.py', '__init__.py']) and file_existed:
+                                        elif _PY_ENTRY_FILE_RE.search(path_lower) and file_existed:
                                             description = f"Enhanced main application with new functionality"
                                         else:
                                             if file_existed:
@@ -707,11 +787,11 @@ Start by reading dependency files, then read the main application files, then cr
                                         # Go files
                                         if 'main.go' in file_path:
                                             description = f"Enhanced main Go application"
-                                        elif 'handler' in file_path.lower() or 'route' in file_path.lower():
+                                        elif 'handler' in path_lower or 'route' in path_lower:
                                             description = f"Added new HTTP handlers"
-                                        elif 'model' in file_path.lower():
+                                        elif 'model' in path_lower:
                                             description = f"Added new data structures"
-                                        elif 'service' in file_path.lower():
+                                        elif 'service' in path_lower:
                                             description = f"Added new service functionality"
                                         else:
                                             if file_existed:
@@ -765,7 +845,7 @@ Start by reading dependency files, then read the main application files, then cr
                                         # PHP files
                                         if 'index.php' in file_path:
                                             description = f"Enhanced main PHP application"
-                                        elif 'api' in file_path.lower() or 'endpoint' in file_path.lower():
+                                        elif 'api' in path_lower or 'endpoint' in path_lower:
                                             description = f"Added new PHP API endpoint"
                                         else:
                                             if file_existed:
@@ -775,11 +855,11 @@ Start by reading dependency files, then read the main application files, then cr
                                     
                                     elif file_path.endswith(('.rb')):
                                         # Ruby files
-                                        if 'controller' in file_path.lower():
+                                        if 'controller' in path_lower:
                                             description = f"Added new Rails controller"
-                                        elif 'model' in file_path.lower():
+                                        elif 'model' in path_lower:
                                             description = f"Added new Rails model"
-                                        elif 'view' in file_path.lower():
+                                        elif 'view' in path_lower:
                                             description = f"Added new Rails view"
                                         else:
                                             if file_existed:
@@ -813,6 +893,14 @@ Start by reading dependency files, then read the main application files, then cr
                                         "file_path": file_path,
                                         "description": description
                                     })
+                                    
+                                    # Report each edit as it lands instead of only in the final summary
+                                    await self._send_tool_update(
+                                        state["correlation_id"],
+                                        "edit",
+                                        filepath=file_path,
+                                        output=description
+                                    )
                                 
                                 # Create tool result message
                                 tool_results.append({
@@ -984,100 +1072,126 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
             
         return state
     
-    @traceable(name="commit_changes")
-    async def _commit_changes_node(self, state: AgentState) -> AgentState:
-        """Commit the changes to git."""
-        try:
-            self._log_node_start("commit_changes", state)
-            
-            await self._send_streaming_update(
-                state["correlation_id"], 
-                "📦 Committing changes...", 
-                progress=70, 
-                step="Committing changes"
-            )
-            
-            state["current_step"] = "commit_changes"
-            state["last_update"] = datetime.utcnow()
+    async def _prepare_branch(self, state: AgentState) -> str:
+        """Return this workflow's feature branch, naming it with the LLM and creating it if needed."""
+        branch_name = await self._get_cached_branch(state)
+        if branch_name is None:
+            create_branch_tool = next(t for t in self.tools if t.name == "create_branch")
+        
+            # Create branch name
+            branch_prompt = f"""Based on the following task description, generate a concise and descriptive branch name that follows git branch naming conventions.
+
+Task: {state['prompt']}
+
+Requirements:
+- Use kebab-case (lowercase with hyphens)
+- Be descriptive but concise (max 50 characters)
+- Start with a type prefix like 'feature/', 'fix/', 'add/', etc.
+- Avoid special characters except hyphens
+- Make it clear what the branch is for
+
+Examples:
+- "Add contact form" → "feature/add-contact-form"
+- "Fix navigation bug" → "fix/navigation-bug"
+- "Update styling" → "feature/update-styling"
+
+Branch name:"""
+        
+            branch_response = await self.llm.ainvoke(branch_prompt)
+            base_branch_name = branch_response.content.strip()
+        
+            base_branch_name = _BRANCH_INVALID_CHARS_RE.sub('', base_branch_name.lower())
+        
+            if not base_branch_name.startswith(_BRANCH_TYPE_PREFIXES):
+                base_branch_name = f"feature/{base_branch_name}"
+        
+            branch_name = f"{base_branch_name}-{int(time.time())}"
+        
+            async with self._git_sem:
+                await create_branch_tool.ainvoke({
+                    "correlation_id": state["correlation_id"],
+                    "repo_path": state["repo_path"],
+                    "branch_name": branch_name
+                })
+            self._branch_cache[state["correlation_id"]] = branch_name
+        
+        return branch_name
+    
+    async def _ensure_branch(self, state: AgentState) -> str:
+        """Return the working branch, creating one if implement_changes did not."""
+        # Use the existing branch name from implement_changes_node
+        if state.get("branch_name"):
+            return state["branch_name"]
+        
+        # If no branch was created yet, create one now
+        branch_name = await self._get_cached_branch(state)
+        
+        if branch_name is None:
+            branch_name = f"backspace-agent-{state['correlation_id'][:8]}"
             
-            # Use the existing branch name from implement_changes_node
-            # If no branch was created yet, create one now
-            if not state.get("branch_name"):
-                branch_name = f"backspace-agent-{state['correlation_id'][:8]}"
-                state["branch_name"] = branch_name
-                
-                # Create the branch first
-                create_branch_tool = next(t for t in self.tools if t.name == "create_branch")
+            create_branch_tool = next(t for t in self.tools if t.name == "create_branch")
+            async with self._git_sem:
                 branch_result = await create_branch_tool.ainvoke({
                     "correlation_id": state["correlation_id"],
                     "repo_path": state["repo_path"],
                     "branch_name": branch_name
                 })
-                
-                if not branch_result.get("success", False):
-                    raise Exception(f"Failed to create branch: {branch_result.get('error', 'Unknown error')}")
-            else:
-                # Branch already exists from implement_changes_node
-                branch_name = state["branch_name"]
-            
-            # Commit the changes
-            commit_tool = next(t for t in self.tools if t.name == "commit_changes")
-            result = await commit_tool.ainvoke({
-                "correlation_id": state["correlation_id"],
-                "repo_path": state["repo_path"],
-                "message": f"feat: {state['prompt'][:50]}..."
-            })
             
-            state["commit_hash"] = result.get("commit_hash")
+            if not branch_result.get("success", False):
+                raise Exception(f"Failed to create branch: {branch_result.get('error', 'Unknown error')}")
+            self._branch_cache[state["correlation_id"]] = branch_name
+        
+        state["branch_name"] = branch_name
+        return branch_name
+    
+    @traceable(name="commit_and_push")
+    async def _commit_and_push_node(self, state: AgentState) -> AgentState:
+        """Commit the changes and push the branch with a single tool call."""
+        try:
+            self._log_node_start("commit_and_push", state)
             
             await self._send_streaming_update(
                 state["correlation_id"], 
-                f"✅ Changes committed to branch: {branch_name}"
+                "📦 Committing and pushing changes...", 
+                progress=70, 
+                step="Committing and pushing changes"
             )
             
-            state["steps_completed"].append("commit_changes")
-            self._log_node_success("commit_changes", state)
+            state["current_step"] = "commit_and_push"
+            state["last_update_ns"] = time.monotonic_ns()
             
-        except Exception as e:
-            state = await self._handle_node_error("commit_changes", state, e)
+            branch_name = await self._ensure_branch(state)
             
-        return state
-    
-    @traceable(name="push_changes")
-    async def _push_changes_node(self, state: AgentState) -> AgentState:
-        """Push changes to the remote repository."""
-        try:
-            self._log_node_start("push_changes", state)
-            
-            await self._send_streaming_update(
-                state["correlation_id"], 
-                "🚀 Pushing changes to remote...", 
-                progress=85, 
-                step="Pushing changes"
+            # Resolve the GitHub repo for the PR step while the push is uploading
+            prewarm_task = asyncio.create_task(
+                self.git_service.prewarm_repository(state["correlation_id"], state["repo_url"])
             )
             
-            state["current_step"] = "push_changes"
-            state["last_update"] = datetime.utcnow()
-            
-            push_tool = next(t for t in self.tools if t.name == "push_changes")
-            result = await push_tool.ainvoke({
-                "correlation_id": state["correlation_id"],
-                "repo_path": state["repo_path"],
-                "branch_name": state["branch_name"]
-            })
+            commit_and_push_tool = next(t for t in self.tools if t.name == "commit_and_push")
+            try:
+                async with self._git_sem:
+                    result = await commit_and_push_tool.ainvoke({
+                        "correlation_id": state["correlation_id"],
+                        "repo_path": state["repo_path"],
+                        "message": f"feat: {state['prompt'][:50]}...",
+                        "branch_name": branch_name
+                    })
+            finally:
+                await prewarm_task
             
+            state["commit_hash"] = result.get("commit_hash")
             state["push_success"] = result.get("success", False)
             
             await self._send_streaming_update(
                 state["correlation_id"], 
-                f"✅ Changes pushed to remote branch: {state['branch_name']}"
+                f"✅ Changes committed and pushed to remote branch: {branch_name}"
             )
             
-            state["steps_completed"].append("push_changes")
-            self._log_node_success("push_changes", state)
+            state["steps_completed"].extend(["commit_changes", "push_changes"])
+            self._log_node_success("commit_and_push", state)
             
         except Exception as e:
-            state = await self._handle_node_error("push_changes", state, e)
+            state = await self._handle_node_error("commit_and_push", state, e)
             
         return state
     
@@ -1089,10 +1203,10 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
             self._log_node_start("create_pull_request", state)
             
             state["current_step"] = "create_pull_request"
-            state["last_update"] = datetime.utcnow()
+            state["last_update_ns"] = time.monotonic_ns()
             
             # Create PR title and description
-            changes_summary = []
+            done_items = []
             files_created = []
             files_modified = []
             
@@ -1102,14 +1216,22 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
                     file_path = change.get("file_path", "unknown")
                     description = change.get("description", "")
                     
-                    if "created" in action.lower():
-                        files_created.append(f"- **{file_path}** - {description}")
-                        changes_summary.append(f"- Add {file_path}")
-                    elif "modified" in action.lower():
-                        files_modified.append(f"- **{file_path}** - {description}")
-                        changes_summary.append(f"- Update {file_path}")
+                    action_words = action.lower().split()
+                    bucket = _CHANGE_ACTION_BUCKETS.get(action_words[0]) if action_words else None
+                    if bucket == "created":
+                        files_created.append(file_path)
+                    elif bucket == "modified":
+                        files_modified.append(file_path)
+                    
+                    # Use the descriptive text from the change description
+                    if description and description != f"File {file_path} written":
+                        done_items.append(description)
+                    elif action == "created":
+                        done_items.append(f"Created {file_path}")
+                    elif action == "modified":
+                        done_items.append(f"Modified {file_path}")
                     else:
-                        changes_summary.append(f"- {action.title()} {file_path}")
+                        done_items.append(f"{action.title()} {file_path}")
             
             # Create PR title from prompt
             prompt = state.get("prompt", "Implement changes")
@@ -1118,61 +1240,15 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
             # Get plan details
             plan = state.get('plan', {})
             plan_summary = plan.get('summary', 'No plan summary available')
-            plan_steps = plan.get('steps', [])
             
             # Create detailed PR description
-            pr_body = f"""## 🎯 Task
-{prompt}
-
-## 🚀 What Was Done
-"""
-            
-            # Add what was actually accomplished in simple bullet points
-            if state.get("changes_made"):
-                for change in state["changes_made"]:
-                    file_path = change.get("file_path", "unknown")
-                    description = change.get("description", "")
-                    action = change.get("action", "modified")
-                    
-                    # Use the descriptive text from the change description
-                    if description and description != f"File {file_path} written":
-                        pr_body += f"• {description}\n"
-                    else:
-                        # Fallback to action-based description
-                        if action == "created":
-                            pr_body += f"• Created {file_path}\n"
-                        elif action == "modified":
-                            pr_body += f"• Modified {file_path}\n"
-                        else:
-                            pr_body += f"• {action.title()} {file_path}\n"
-            else:
-                pr_body += "• Implemented requested changes\n"
-            
-            # Add files changed section
-            pr_body += f"""
-## 📁 Files Changed
-"""
-            
-            if files_created:
-                pr_body += "**Files Created:**\n"
-                for file_info in files_created:
-                    # Extract just the file path from the full description
-                    file_path = file_info.split("**")[1].split("**")[0] if "**" in file_info else file_info.replace("- ", "")
-                    pr_body += f"• {file_path}\n"
-                pr_body += "\n"
-            
-            if files_modified:
-                pr_body += "**Files Modified:**\n"
-                for file_info in files_modified:
-                    # Extract just the file path from the full description  
-                    file_path = file_info.split("**")[1].split("**")[0] if "**" in file_info else file_info.replace("- ", "")
-                    pr_body += f"• {file_path}\n"
-                pr_body += "\n"
-            
-            if not files_created and not files_modified:
-                pr_body += "• No specific files detected\n\n"
-            
-            pr_body += "---\n*This pull request was automatically created by **Backspace AI Coding Agent***"
+            pr_body = _PR_BODY_TEMPLATE.render(
+                prompt=prompt,
+                done_items=done_items,
+                files_created=files_created,
+                files_modified=files_modified,
+                plan_summary=plan_summary,
+            )
             
             # Try to create the PR using GitService
             try:
@@ -1183,10 +1259,8 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
                     step="Creating Pull Request"
                 )
                 
-                from app.services.git_service import GitService
-                git_service = GitService()
-                
-                pr_url = await git_service.create_pull_request(
+                # Shared service so the repository handle prewarmed during push is reused
+                pr_url = await self.git_service.create_pull_request(
                     correlation_id=state["correlation_id"],
                     repo_url=state["repo_url"],
                     branch_name=state["branch_name"],
@@ -1262,7 +1336,7 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
                 "files_to_create": []
             }
         except Exception as e:
-            logger.warning(f"Failed to parse plan: {e}")
+            logger.warning("Failed to parse plan: %s", e)
             return {
                 "summary": content,
                 "steps": [content],
@@ -1270,226 +1344,13 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
                 "files_to_create": []
             }
     
-    def _parse_implementation(self, content: str) -> Dict[str, Any]:
-        """Parse the implementation from the LLM response and extract actual file changes."""
-        try:
-            import re
-            json_match = re.search(r'```json\s*(.*?)\s*```', content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group(1))
-            
-            file_changes = []
-            valid_extensions = ('.js', '.jsx', '.ts', '.tsx', '.css', '.html', '.json', '.md', '.txt', '.cjs', '.mjs', '.yml', '.yaml')
-            
-            # Track processed files to prevent duplicates
-            processed_files = set()
-            
-            def is_valid_file_path(path: str) -> bool:
-                path = path.strip()
-                # Remove backticks and other formatting characters
-                path = path.replace('`', '').replace('"', '').replace("'", "")
-                return (
-                    path.endswith(valid_extensions)
-                    and not any(c in path for c in [' ', '\n', '\r'])
-                    and not path.startswith('###')
-                    and '/' in path
-                )
-            
-            def clean_file_path(path: str) -> str:
-                """Clean the file path by removing formatting characters."""
-                # Remove backticks, quotes, and other formatting
-                cleaned = path.replace('`', '').replace('"', '').replace("'", "").strip()
-                
-                # Remove leading/trailing slashes and dots
-                if cleaned.startswith('./'):
-                    cleaned = cleaned[2:]
-                elif cleaned.startswith('/'):
-                    cleaned = cleaned[1:]
-                
-                # Remove workspace prefixes dynamically (don't hardcode specific paths)
-                # Look for patterns like workspace/repo-name/ or /workspace/repo-name/
-                import re
-                workspace_patterns = [
-                    r'^workspace/[^/]+/',  # workspace/repo-name/
-                    r'^/workspace/[^/]+/',  # /workspace/repo-name/
-                    r'^workspace/',  # workspace/
-                    r'^/workspace/',  # /workspace/
-                ]
-                
-                for pattern in workspace_patterns:
-                    cleaned = re.sub(pattern, '', cleaned)
-                
-                return cleaned
-            
-            def clean_code_content(content: str) -> str:
-                """Clean the code content by removing instruction text and markdown."""
-                # Remove common instruction patterns
-                patterns_to_remove = [
-                    r'// Create file.*?with the following content:\s*\n*',
-                    r'// Modify.*?with the following content:\s*\n*',
-                    r'Create file.*?with the following content:\s*\n*',
-                    r'Modify.*?with the following content:\s*\n*',
-                    r'```(?:jsx?|js|tsx?|ts|css|html|json|md|txt|cjs|mjs|yml|yaml)\s*\n*',
-                    r'```\s*\n*',
-                    # Remove instruction lines that start with //
-                    r'^//.*?file.*?`[^`]+`.*?\n*',
-                    r'^//.*?content.*?\n*'
-                ]
-                
-                cleaned = content
-                for pattern in patterns_to_remove:
-                    cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.DOTALL | re.MULTILINE)
-                
-                # Remove leading/trailing whitespace
-                cleaned = cleaned.strip()
-                
-                return cleaned
-            
-            def add_file_change(action: str, file_path: str, file_content: str, description: str = None):
-                """Add a file change, avoiding duplicates."""
-                if not is_valid_file_path(file_path):
-                    return
-                
-                file_path = clean_file_path(file_path)
-                
-                # Skip if we've already processed this file
-                if file_path in processed_files:
-                    return
-                
-                file_content = clean_code_content(file_content)
-                
-                if file_content:  # Only add if we have actual content
-                    processed_files.add(file_path)
-                    file_changes.append({
-                        "action": action,
-                        "file_path": file_path,
-                        "content": file_content,
-                        "description": description or f"{action.capitalize()} {file_path} with provided content"
-                    })
-            
-            # Simplified patterns to avoid overlaps - prioritize more specific patterns first
-            all_patterns = [
-                # Create patterns (most specific first)
-                (r'create.*?file.*?`([^`]+)`.*?```(?:jsx?|js|tsx?|ts|css|html|json|md|txt|cjs|mjs|yml|yaml)\s*\n(.*?)```', 'create'),
-                (r'new.*?file.*?`([^`]+)`.*?```(?:jsx?|js|tsx?|ts|css|html|json|md|txt|cjs|mjs|yml|yaml)\s*\n(.*?)```', 'create'),
-                # Modify patterns
-                (r'modify.*?`([^`]+)`.*?```(?:jsx?|js|tsx?|ts|css|html|json|md|txt|cjs|mjs|yml|yaml)\s*\n(.*?)```', 'modify'),
-                (r'update.*?`([^`]+)`.*?```(?:jsx?|js|tsx?|ts|css|html|json|md|txt|cjs|mjs|yml|yaml)\s*\n(.*?)```', 'modify'),
-                # Generic patterns (less specific)
-                (r'`([^`]+\.(?:js|jsx|ts|tsx|css|html|json|md|txt|cjs|mjs|yml|yaml))`.*?```(?:jsx?|js|tsx?|ts|css|html|json|md|txt|cjs|mjs|yml|yaml)\s*\n(.*?)```', 'create'),
-            ]
-            
-            for pattern, action in all_patterns:
-                matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-                for match in matches:
-                    file_path = match.group(1).strip()
-                    file_content = match.group(2).strip()
-                    add_file_change(action, file_path, file_content)
-            
-            if not file_changes:
-                return {
-                    "file_changes": [],
-                    "description": "No actionable file changes found in the model output.",
-                    "success": False,
-                    "error": "No valid file changes detected. Please check the LLM output or prompt for clarification."
-                }
-            
-            return {
-                "file_changes": file_changes,
-                "description": f"Implementation completed with {len(file_changes)} file changes",
-                "success": True
-            }
-        except Exception as e:
-            logger.warning(f"Failed to parse implementation: {e}")
-            return {
-                "file_changes": [],
-                "description": f"Failed to parse implementation: {e}",
-                "success": False,
-                "error": str(e)
-            }
-    
-    def _parse_implementation_with_incremental_support(self, content: str, existing_files_content: Dict[str, str]) -> Dict[str, Any]:
-        """Parse implementation with support for incremental changes."""
-        try:
-            import re
-            
-            # First try the original parsing method
-            original_result = self._parse_implementation(content)
-            
-            # If original parsing found changes, check if any are modifications to existing files
-            if original_result.get("file_changes"):
-                # Fix the action types based on existing files
-                for change in original_result["file_changes"]:
-                    file_path = change["file_path"]
-                    # If the file exists in our existing_files_content, it should be a modify action
-                    if file_path in existing_files_content:
-                        print(f"CORRECTING: {file_path} should be 'modify' not '{change['action']}'")
-                        change["action"] = "modify"
-                        # Add a flag to indicate we need smart integration
-                        change["needs_smart_integration"] = True
-                
-                return original_result
-            
-            # Try to parse the actual format the LLM is providing
-            file_changes = []
-            
-            # Pattern for files with comments like "// File: path/to/file.jsx"
-            file_comment_pattern = r'// File:\s*([^\n]+)\s*\n\n(.*?)```'
-            
-            # Pattern for standard code blocks with file paths
-            code_block_pattern = r'```(?:jsx?|js|tsx?|ts|css|html|json|md|txt|cjs|mjs|yml|yaml)\s*\n(.*?)```'
-            
-            # First, find all file comments and their associated code blocks
-            file_matches = re.finditer(file_comment_pattern, content, re.DOTALL)
-            for match in file_matches:
-                file_path = match.group(1).strip()
-                remaining_content = match.group(2)
-                
-                # Clean the file path
-                file_path = clean_file_path(file_path.strip())
-                
-                # Find the code block immediately after
-                code_match = re.search(code_block_pattern, remaining_content, re.DOTALL)
-                if code_match:
-                    file_content = code_match.group(1).strip()
-                    
-                    # Determine if this should be create or modify
-                    action = "modify" if file_path in existing_files_content else "create"
-                    
-                    file_changes.append({
-                        "action": action,
-                        "file_path": file_path,
-                        "content": file_content,
-                        "description": f"{'Modify' if action == 'modify' else 'Create'} {file_path}",
-                        "needs_smart_integration": action == "modify"
-                    })
-            
-            if file_changes:
-                return {
-                    "file_changes": file_changes,
-                    "description": f"Implementation with {len(file_changes)} file changes",
-                    "success": True
-                }
-            else:
-                return {
-                    "file_changes": [],
-                    "description": "No file changes detected",
-                    "success": False,
-                    "error": "Could not parse any file changes from LLM response"
-                }
-                
-        except Exception as e:
-            logger.warning(f"Failed to parse incremental implementation: {e}")
-            return {
-                "file_changes": [],
-                "description": f"Failed to parse incremental implementation: {e}",
-                "success": False,
-                "error": str(e)
-            }
-    
     async def cleanup(self, correlation_id: str = None):
         """Cleanup resources including sandbox containers."""
         try:
+            if correlation_id:
+                self._branch_cache.pop(correlation_id, None)
+                if self.git_service:
+                    self.git_service.forget_repository(correlation_id)
             if correlation_id and self.sandbox_service:
                 await self.sandbox_service.cleanup_sandbox(correlation_id)
                 self.telemetry.log_event(
@@ -1497,7 +1358,7 @@ Continue with the next necessary step, or respond with 'TASK COMPLETE' if everyt
                     correlation_id=correlation_id
                 )
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
             self.telemetry.log_error(
                 e,
                 context={"correlation_id": correlation_id, "operation": "cleanup"},
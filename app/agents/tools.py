@@ -3,10 +3,17 @@ LangChain tools for the Backspace Coding Agent.
 """
 
 import asyncio
-import json
+import copy
 import logging
-import os
-from typing import Any, Dict, List, Optional
+import re
+import time
+import tomllib
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
@@ -17,6 +24,156 @@ from app.core.telemetry import get_telemetry
 
 logger = logging.getLogger(__name__)
 
+# Process-wide telemetry manager, resolved once and shared by every tool instance
+_telemetry = get_telemetry()
+
+# Lowercase file names surfaced as key files by repository analysis
+_KEY_FILE_NAMES = frozenset({
+    "readme.md", "main.py", "app.js", "index.js", "index.html", "package.json",
+    "requirements.txt", "pipfile", "pyproject.toml", "go.mod", "cargo.toml",
+    "main.go", "lib.rs", "main.rs", "composer.json", "gemfile", "pom.xml",
+    "build.gradle", "dockerfile", "docker-compose.yml", "makefile"
+})
+
+# File extension -> language reported by repository analysis
+_EXTENSION_LANGUAGES = {
+    ".py": "Python",
+    ".js": "JavaScript/TypeScript", ".jsx": "JavaScript/TypeScript", ".ts": "JavaScript/TypeScript",
+    ".tsx": "JavaScript/TypeScript", ".mjs": "JavaScript/TypeScript",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".java": "JVM Languages", ".kotlin": "JVM Languages", ".scala": "JVM Languages",
+    ".php": "PHP",
+    ".rb": "Ruby",
+    ".cs": ".NET", ".vb": ".NET",
+    ".cpp": "C/C++", ".cc": "C/C++", ".cxx": "C/C++", ".c": "C/C++", ".h": "C/C++", ".hpp": "C/C++",
+    ".swift": "Swift",
+    ".html": "HTML", ".htm": "HTML",
+    ".css": "CSS/Styling", ".scss": "CSS/Styling", ".sass": "CSS/Styling", ".less": "CSS/Styling",
+}
+
+# Lowercase dependency file name -> (format, language)
+_DEPENDENCY_FILE_NAMES = {
+    "package.json": ("package.json", "javascript"),
+    "requirements.txt": ("requirements.txt", "python"),
+    "pipfile": ("Pipfile", "python"),
+    "pyproject.toml": ("pyproject.toml", "python"),
+    "go.mod": ("go.mod", "go"),
+    "cargo.toml": ("Cargo.toml", "rust"),
+    "composer.json": ("composer.json", "php"),
+    "gemfile": ("Gemfile", "ruby"),
+    "pom.xml": ("pom.xml", "java"),
+    "build.gradle": ("build.gradle", "java"),
+    "packages.config": ("packages.config", "csharp"),
+}
+
+# First version-specifier character in a requirements.txt line (==, >=, <=, ~=, !=, <, >)
+_REQUIREMENT_SPECIFIER_RE = re.compile(r'[=<>~!]')
+
+# Wildcard dependency files matched by suffix: (suffix, format, language)
+_WILDCARD_DEPENDENCY_SUFFIXES = ((".csproj", "*.csproj", "csharp"),)
+
+# Lowercase file name -> (is key file, dependency (format, language) or None); merges the two
+# tables above so classifying a file name costs a single lookup
+_FILENAME_ROLES = {
+    name: (name in _KEY_FILE_NAMES, _DEPENDENCY_FILE_NAMES.get(name))
+    for name in _KEY_FILE_NAMES | _DEPENDENCY_FILE_NAMES.keys()
+}
+
+
+# (repo_url, HEAD sha) -> (time.monotonic() when stored, analysis). The SHA pins the
+# repository contents, so an entry is valid until the TTL bounds its staleness.
+_ANALYSIS_CACHE: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_ANALYSIS_CACHE_TTL = 600.0
+_ANALYSIS_CACHE_MAX_ENTRIES = 128
+
+# Dependency files with a parser in _DEPENDENCY_PARSERS are read up to 1 MiB; the rest only need a preview
+_PARSED_DEPENDENCY_MAX_BYTES = 1024 * 1024
+_RAW_DEPENDENCY_PREVIEW_BYTES = 512
+
+# Upper bound on sandbox reads in flight for a single read_files call
+_READ_FILES_CONCURRENCY = 16
+
+# Most file paths listed in a repository analysis; file_count still reports the full total.
+# Keeps the tool result handed to the model (and each cached copy) bounded on huge repos
+_ANALYSIS_MAX_LISTED_FILES = 5000
+
+
+def _split_path(path: str) -> Tuple[str, str]:
+    """
+    Split a repository path into (basename, extension) with one right-to-left scan each.
+    
+    Equivalent to os.path.basename plus os.path.splitext for the POSIX paths the
+    sandbox returns, without the generic separator handling.
+    """
+    filename = path[path.rfind('/') + 1:]
+    dot = filename.rfind('.')
+    # Like splitext, leading dots (".env", "..rc") do not start an extension
+    if dot > 0 and filename[:dot].lstrip('.'):
+        return filename, filename[dot:]
+    return filename, ''
+
+
+def _parse_package_json(content: str) -> Dict[str, Any]:
+    """Extract the dependency sections of a package.json file."""
+    package_data = _json_loads(content)
+    return {
+        "dependencies": package_data.get("dependencies", {}),
+        "devDependencies": package_data.get("devDependencies", {}),
+        "peerDependencies": package_data.get("peerDependencies", {}),
+        "optionalDependencies": package_data.get("optionalDependencies", {})
+    }
+
+
+def _parse_requirements_txt(content: str) -> Dict[str, Any]:
+    """Map each requirement's package name to its full requirements.txt line."""
+    deps = {}
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        # Extract package name (before ==, >=, etc.)
+        pkg_name = _REQUIREMENT_SPECIFIER_RE.split(line, 1)[0].strip()
+        deps[pkg_name] = line
+    return {"dependencies": deps}
+
+
+def _parse_pipfile(content: str) -> Dict[str, Any]:
+    """Extract the package sections of a Pipfile."""
+    toml_data = tomllib.loads(content)
+    return {
+        "packages": toml_data.get("packages", {}),
+        "dev-packages": toml_data.get("dev-packages", {})
+    }
+
+
+def _parse_pyproject_toml(content: str) -> Dict[str, Any]:
+    """Extract the PEP 621 dependency lists of a pyproject.toml file."""
+    project = tomllib.loads(content).get("project", {})
+    return {
+        "dependencies": project.get("dependencies", []),
+        "optional-dependencies": project.get("optional-dependencies", {})
+    }
+
+
+def _parse_cargo_toml(content: str) -> Dict[str, Any]:
+    """Extract the dependency tables of a Cargo.toml file."""
+    toml_data = tomllib.loads(content)
+    return {
+        "dependencies": toml_data.get("dependencies", {}),
+        "dev-dependencies": toml_data.get("dev-dependencies", {})
+    }
+
+
+# Dependency file format -> parser returning its structured dependencies
+_DEPENDENCY_PARSERS = {
+    "package.json": _parse_package_json,
+    "requirements.txt": _parse_requirements_txt,
+    "Pipfile": _parse_pipfile,
+    "pyproject.toml": _parse_pyproject_toml,
+    "Cargo.toml": _parse_cargo_toml,
+}
+
 
 class AnalyzeRepositoryInput(BaseModel):
     """Input for repository analysis."""
@@ -38,19 +195,38 @@ class AnalyzeRepositoryTool(BaseTool):
         super().__init__()
         self._sandbox_service = sandbox_service
         self._git_service = git_service
-        self._telemetry = get_telemetry()
+        self._telemetry = _telemetry
     
     async def _arun(self, correlation_id: str, repo_url: str) -> Dict[str, Any]:
         if not correlation_id:
             raise ValueError("correlation_id missing in AnalyzeRepositoryTool._arun")
         try:
-            # Step 1: Clone the repository
-            repo_path = await self._git_service.clone_repository(
+            # Step 1: Clone the repository (reusing this workflow's clone if present)
+            repo_path = await self._git_service.ensure_repository(
                 correlation_id=correlation_id,
                 repo_url=repo_url,
                 sandbox_service=self._sandbox_service
             )
             
+            # Reuse a recent analysis of the same commit instead of rescanning
+            head_sha = await self._git_service.get_head_sha(
+                correlation_id=correlation_id,
+                repo_path=repo_path,
+                sandbox_service=self._sandbox_service
+            )
+            cache_key = (repo_url, head_sha) if head_sha else None
+            cached = _ANALYSIS_CACHE.get(cache_key) if cache_key else None
+            if cached and time.monotonic() - cached[0] < _ANALYSIS_CACHE_TTL:
+                self._telemetry.log_event(
+                    "Repository analysis cache hit",
+                    correlation_id=correlation_id,
+                    repo_url=repo_url,
+                    head_sha=head_sha
+                )
+                analysis = copy.deepcopy(cached[1])
+                analysis["repo_path"] = repo_path
+                return analysis
+            
             # Step 2: List files
             files = await self._git_service.list_repository_files(
                 correlation_id=correlation_id,
@@ -58,155 +234,99 @@ class AnalyzeRepositoryTool(BaseTool):
                 sandbox_service=self._sandbox_service
             )
             
-            # Step 3: Analyze file types, key files, and languages
+            # Step 3: Classify every file in a single pass
             file_types = set()
             key_files = []
             languages = set()
+            dependency_files = []
             dependencies = {}
             
             for f in files:
-                ext = os.path.splitext(f)[1]
+                filename, ext = _split_path(f)
+                filename_lower = filename.lower()
+                
                 if ext:
                     file_types.add(ext)
-                if os.path.basename(f).lower() in {
-                    "readme.md", "main.py", "app.js", "index.js", "index.html", "package.json",
-                    "requirements.txt", "pipfile", "pyproject.toml", "go.mod", "cargo.toml",
-                    "main.go", "lib.rs", "main.rs", "composer.json", "gemfile", "pom.xml",
-                    "build.gradle", "dockerfile", "docker-compose.yml", "makefile"
-                }:
-                    key_files.append(f)
-                if ext in {".py"}:
-                    languages.add("Python")
-                elif ext in {".js", ".jsx", ".ts", ".tsx", ".mjs"}:
-                    languages.add("JavaScript/TypeScript")
-                elif ext in {".go"}:
-                    languages.add("Go")
-                elif ext in {".rs"}:
-                    languages.add("Rust")
-                elif ext in {".java", ".kotlin", ".scala"}:
-                    languages.add("JVM Languages")
-                elif ext in {".php"}:
-                    languages.add("PHP")
-                elif ext in {".rb"}:
-                    languages.add("Ruby")
-                elif ext in {".cs", ".vb"}:
-                    languages.add(".NET")
-                elif ext in {".cpp", ".cc", ".cxx", ".c", ".h", ".hpp"}:
-                    languages.add("C/C++")
-                elif ext in {".swift"}:
-                    languages.add("Swift")
-                elif ext in {".html", ".htm"}:
-                    languages.add("HTML")
-                elif ext in {".css", ".scss", ".sass", ".less"}:
-                    languages.add("CSS/Styling")
-            
-            # Step 4: Check for dependency files and extract dependencies
-            dependency_files = []
-            dependencies = {}
-            
-            # Look for various dependency file types
-            dependency_patterns = {
-                "package.json": "javascript",
-                "requirements.txt": "python", 
-                "Pipfile": "python",
-                "pyproject.toml": "python",
-                "go.mod": "go",
-                "Cargo.toml": "rust", 
-                "composer.json": "php",
-                "Gemfile": "ruby",
-                "pom.xml": "java",
-                "build.gradle": "java",
-                "packages.config": "csharp",
-                "*.csproj": "csharp"
-            }
-            
-            for f in files:
-                filename = os.path.basename(f).lower()
-                for pattern, lang in dependency_patterns.items():
-                    if pattern.startswith("*"):
-                        # Handle wildcard patterns like *.csproj
-                        if filename.endswith(pattern[1:]):
-                            dependency_files.append({"file": f, "type": lang, "format": pattern})
-                    elif filename == pattern:
-                        dependency_files.append({"file": f, "type": lang, "format": pattern})
-            
-            # Parse dependency files
-            for dep_file in dependency_files:
-                try:
-                    content = await self._git_service.get_file_content(
+                
+                language = _EXTENSION_LANGUAGES.get(ext)
+                if language:
+                    languages.add(language)
+                
+                # Step 4: Key and dependency files in one lookup; wildcard *.csproj projects on a miss
+                role = _FILENAME_ROLES.get(filename_lower)
+                if role is not None:
+                    is_key_file, dependency = role
+                    if is_key_file:
+                        key_files.append(f)
+                else:
+                    dependency = None
+                    for suffix, dep_format, dep_language in _WILDCARD_DEPENDENCY_SUFFIXES:
+                        if filename_lower.endswith(suffix):
+                            dependency = (dep_format, dep_language)
+                            break
+                if dependency:
+                    dependency_files.append({"file": f, "type": dependency[1], "format": dependency[0]})
+            
+            # Read all dependency files concurrently, then parse them in order
+            contents = await asyncio.gather(
+                *(
+                    self._git_service.get_file_content(
                         correlation_id=correlation_id,
                         repo_path=repo_path,
                         file_path=dep_file["file"],
-                        sandbox_service=self._sandbox_service
+                        sandbox_service=self._sandbox_service,
+                        max_bytes=(
+                            _PARSED_DEPENDENCY_MAX_BYTES
+                            if dep_file["format"] in _DEPENDENCY_PARSERS
+                            else _RAW_DEPENDENCY_PREVIEW_BYTES
+                        )
                     )
+                    for dep_file in dependency_files
+                ),
+                return_exceptions=True
+            )
+            
+            # Parse dependency files
+            parsed_files = []
+            failed_files = []
+            for dep_file, content in zip(dependency_files, contents):
+                try:
+                    if isinstance(content, Exception):
+                        raise content
                     
-                    # Parse based on file type
-                    if dep_file["format"] == "package.json":
-                        import json
-                        package_data = json.loads(content)
-                        dependencies[dep_file["format"]] = {
-                            "dependencies": package_data.get("dependencies", {}),
-                            "devDependencies": package_data.get("devDependencies", {}),
-                            "peerDependencies": package_data.get("peerDependencies", {}),
-                            "optionalDependencies": package_data.get("optionalDependencies", {})
-                        }
-                    elif dep_file["format"] == "requirements.txt":
-                        # Parse requirements.txt format
-                        lines = content.strip().split('\n')
-                        deps = {}
-                        for line in lines:
-                            line = line.strip()
-                            if line and not line.startswith('#'):
-                                # Extract package name (before ==, >=, etc.)
-                                pkg_name = line.split('==')[0].split('>=')[0].split('<=')[0].split('~=')[0].strip()
-                                deps[pkg_name] = line
-                        dependencies[dep_file["format"]] = {"dependencies": deps}
-                    elif dep_file["format"] in ["Pipfile", "pyproject.toml", "Cargo.toml"]:
-                        # These are TOML format files
-                        try:
-                            import toml
-                            toml_data = toml.loads(content)
-                            if dep_file["format"] == "Pipfile":
-                                dependencies[dep_file["format"]] = {
-                                    "packages": toml_data.get("packages", {}),
-                                    "dev-packages": toml_data.get("dev-packages", {})
-                                }
-                            elif dep_file["format"] == "Cargo.toml":
-                                dependencies[dep_file["format"]] = {
-                                    "dependencies": toml_data.get("dependencies", {}),
-                                    "dev-dependencies": toml_data.get("dev-dependencies", {})
-                                }
-                            elif dep_file["format"] == "pyproject.toml":
-                                dependencies[dep_file["format"]] = {
-                                    "dependencies": toml_data.get("project", {}).get("dependencies", []),
-                                    "optional-dependencies": toml_data.get("project", {}).get("optional-dependencies", {})
-                                }
-                        except ImportError:
-                            dependencies[dep_file["format"]] = {"error": "TOML parser not available"}
+                    parser = _DEPENDENCY_PARSERS.get(dep_file["format"])
+                    if parser is not None:
+                        dependencies[dep_file["format"]] = parser(content)
                     else:
                         # For other formats, just store the raw content for now
                         dependencies[dep_file["format"]] = {"raw_content": content[:500] + "..." if len(content) > 500 else content}
                     
-                    # Log analysis for common dependencies
-                    self._telemetry.log_event(
-                        f"Dependency file analyzed: {dep_file['format']}",
-                        correlation_id=correlation_id,
-                        language=dep_file["type"],
-                        file_path=dep_file["file"]
-                    )
+                    parsed_files.append({"format": dep_file["format"], "language": dep_file["type"], "file": dep_file["file"]})
                     
                 except Exception as e:
-                    self._telemetry.log_event(
-                        f"Failed to parse {dep_file['format']}",
-                        correlation_id=correlation_id,
-                        error=str(e),
-                        level="warning"
-                    )
+                    failed_files.append({"format": dep_file["format"], "file": dep_file["file"], "error": str(e)})
                     dependencies[dep_file["format"]] = {"error": f"Failed to parse: {str(e)}"}
             
+            # One event per analysis rather than one per dependency file
+            if parsed_files:
+                self._telemetry.log_event(
+                    "Dependency files analyzed",
+                    correlation_id=correlation_id,
+                    files=parsed_files
+                )
+            if failed_files:
+                self._telemetry.log_event(
+                    "Failed to parse dependency files",
+                    correlation_id=correlation_id,
+                    failures=failed_files,
+                    level="warning"
+                )
+            
             analysis = {
                 "repo_path": repo_path,
-                "files": files,
+                "files": files[:_ANALYSIS_MAX_LISTED_FILES],
+                "file_count": len(files),
+                "files_truncated": len(files) > _ANALYSIS_MAX_LISTED_FILES,
                 "file_types": list(file_types),
                 "key_files": key_files,
                 "languages": list(languages),
@@ -215,6 +335,13 @@ class AnalyzeRepositoryTool(BaseTool):
                 "has_dependencies": len(dependency_files) > 0
             }
             
+            if cache_key:
+                _ANALYSIS_CACHE.pop(cache_key, None)
+                if len(_ANALYSIS_CACHE) >= _ANALYSIS_CACHE_MAX_ENTRIES:
+                    # Dicts keep insertion order, so the first key is the oldest entry
+                    _ANALYSIS_CACHE.pop(next(iter(_ANALYSIS_CACHE)))
+                _ANALYSIS_CACHE[cache_key] = (time.monotonic(), copy.deepcopy(analysis))
+            
             self._telemetry.log_event(
                 "Repository analysis completed",
                 correlation_id=correlation_id,
@@ -241,6 +368,7 @@ class ReadFileInput(BaseModel):
     correlation_id: str = Field(description="Correlation ID for tracking")
     repo_path: str = Field(description="Repository path")
     file_path: str = Field(description="Path to the file to read")
+    max_bytes: Optional[int] = Field(default=None, description="Only read this many leading bytes (optional)")
 
 
 class ReadFileTool(BaseTool):
@@ -257,16 +385,17 @@ class ReadFileTool(BaseTool):
         super().__init__()
         self._git_service = git_service
         self._sandbox_service = sandbox_service
-        self._telemetry = get_telemetry()
+        self._telemetry = _telemetry
     
-    async def _arun(self, correlation_id: str, repo_path: str, file_path: str) -> str:
+    async def _arun(self, correlation_id: str, repo_path: str, file_path: str, max_bytes: Optional[int] = None) -> str:
         """Read file asynchronously."""
         try:
             content = await self._git_service.get_file_content(
                 correlation_id=correlation_id,
                 repo_path=repo_path,
                 file_path=file_path,
-                sandbox_service=self._sandbox_service
+                sandbox_service=self._sandbox_service,
+                max_bytes=max_bytes
             )
             
             self._telemetry.log_event(
@@ -290,6 +419,65 @@ class ReadFileTool(BaseTool):
         raise NotImplementedError("Synchronous run is not supported. Use async.")
 
 
+class ReadFilesInput(BaseModel):
+    """Input for reading several files at once."""
+    correlation_id: str = Field(description="Correlation ID for tracking")
+    repo_path: str = Field(description="Repository path")
+    file_paths: List[str] = Field(description="Paths of the files to read")
+
+
+class ReadFilesTool(BaseTool):
+    """Tool for reading several files concurrently."""
+    
+    name: str = "read_files"
+    description: str = "Read the contents of several files in the repository in one call"
+    args_schema: type[ReadFilesInput] = ReadFilesInput
+    _git_service: GitService = PrivateAttr()
+    _sandbox_service: SandboxService = PrivateAttr()
+    _telemetry: Any = PrivateAttr()
+    
+    def __init__(self, git_service: GitService, sandbox_service: SandboxService):
+        super().__init__()
+        self._git_service = git_service
+        self._sandbox_service = sandbox_service
+        self._telemetry = _telemetry
+    
+    async def _arun(self, correlation_id: str, repo_path: str, file_paths: List[str]) -> Dict[str, Any]:
+        """Read files concurrently, bounded so one call cannot flood the sandbox."""
+        semaphore = asyncio.Semaphore(_READ_FILES_CONCURRENCY)
+        
+        async def read_one(file_path: str) -> str:
+            async with semaphore:
+                return await self._git_service.get_file_content(
+                    correlation_id=correlation_id,
+                    repo_path=repo_path,
+                    file_path=file_path,
+                    sandbox_service=self._sandbox_service
+                )
+        
+        results = await asyncio.gather(*(read_one(p) for p in file_paths), return_exceptions=True)
+        
+        files = {}
+        errors = {}
+        for file_path, result in zip(file_paths, results):
+            if isinstance(result, Exception):
+                errors[file_path] = str(result)
+            else:
+                files[file_path] = result
+        
+        self._telemetry.log_event(
+            "Files read successfully",
+            correlation_id=correlation_id,
+            file_count=len(files),
+            error_count=len(errors)
+        )
+        
+        return {"files": files, "errors": errors}
+
+    def _run(self, *args, **kwargs):
+        raise NotImplementedError("Synchronous run is not supported. Use async.")
+
+
 class WriteFileInput(BaseModel):
     """Input for writing files."""
     correlation_id: str = Field(description="Correlation ID for tracking")
@@ -312,7 +500,7 @@ class WriteFileTool(BaseTool):
         super().__init__()
         self._git_service = git_service
         self._sandbox_service = sandbox_service
-        self._telemetry = get_telemetry()
+        self._telemetry = _telemetry
     
     async def _arun(self, correlation_id: str, repo_path: str, file_path: str, content: str) -> Dict[str, Any]:
         """Write file asynchronously."""
@@ -373,7 +561,7 @@ class CreateBranchTool(BaseTool):
         super().__init__()
         self._git_service = git_service
         self._sandbox_service = sandbox_service
-        self._telemetry = get_telemetry()
+        self._telemetry = _telemetry
     
     async def _arun(self, correlation_id: str, repo_path: str, branch_name: str) -> Dict[str, Any]:
         """Create branch asynchronously."""
@@ -431,7 +619,7 @@ class CommitChangesTool(BaseTool):
         super().__init__()
         self._git_service = git_service
         self._sandbox_service = sandbox_service
-        self._telemetry = get_telemetry()
+        self._telemetry = _telemetry
     
     async def _arun(self, correlation_id: str, repo_path: str, message: str) -> Dict[str, Any]:
         """Commit changes asynchronously."""
@@ -491,7 +679,7 @@ class PushChangesTool(BaseTool):
         super().__init__()
         self._git_service = git_service
         self._sandbox_service = sandbox_service
-        self._telemetry = get_telemetry()
+        self._telemetry = _telemetry
     
     async def _arun(self, correlation_id: str, repo_path: str, branch_name: str) -> Dict[str, Any]:
         """Push changes asynchronously."""
@@ -528,6 +716,69 @@ class PushChangesTool(BaseTool):
         raise NotImplementedError("Synchronous run is not supported. Use async.")
 
 
+class CommitAndPushInput(BaseModel):
+    """Input for committing and pushing changes."""
+    correlation_id: str = Field(description="Correlation ID for tracking")
+    repo_path: str = Field(description="Repository path")
+    message: str = Field(description="Commit message")
+    branch_name: str = Field(description="Name of the branch to push")
+
+
+class CommitAndPushTool(BaseTool):
+    """Tool for committing git changes and pushing them in one step."""
+    
+    name: str = "commit_and_push"
+    description: str = "Commit changes and push the branch to the remote repository"
+    args_schema: type[CommitAndPushInput] = CommitAndPushInput
+    _git_service: GitService = PrivateAttr()
+    _sandbox_service: SandboxService = PrivateAttr()
+    _telemetry: Any = PrivateAttr()
+    
+    def __init__(self, git_service: GitService, sandbox_service: SandboxService):
+        super().__init__()
+        self._git_service = git_service
+        self._sandbox_service = sandbox_service
+        self._telemetry = _telemetry
+    
+    async def _arun(self, correlation_id: str, repo_path: str, message: str, branch_name: str) -> Dict[str, Any]:
+        """Commit and push changes asynchronously."""
+        try:
+            commit_hash = await self._git_service.commit_and_push(
+                correlation_id=correlation_id,
+                repo_path=repo_path,
+                message=message,
+                branch_name=branch_name,
+                sandbox_service=self._sandbox_service
+            )
+            
+            result = {
+                "success": True,
+                "commit_hash": commit_hash,
+                "message": message,
+                "branch_name": branch_name
+            }
+            
+            self._telemetry.log_event(
+                "Changes committed and pushed successfully",
+                correlation_id=correlation_id,
+                commit_hash=commit_hash,
+                branch_name=branch_name
+            )
+            
+            return result
+            
+        except Exception as e:
+            self._telemetry.log_error(
+                e,
+                context={"correlation_id": correlation_id, "branch_name": branch_name},
+                correlation_id=correlation_id
+            )
+            raise
+
+    def _run(self, *args, **kwargs):
+        raise NotImplementedError("Synchronous run is not supported. Use async.")
+
+
 class ExecuteCommandInput(BaseModel):
     """Input for executing commands."""
     correlation_id: str = Field(description="Correlation ID for tracking")
@@ -546,7 +797,7 @@ class ExecuteCommandTool(BaseTool):
     def __init__(self, sandbox_service: SandboxService):
         super().__init__()
         self._sandbox_service = sandbox_service
-        self._telemetry = get_telemetry()
+        self._telemetry = _telemetry
     
     async def _arun(self, correlation_id: str, command: str, working_dir: str) -> Dict[str, Any]:
         """Execute command asynchronously."""
@@ -592,9 +843,11 @@ def create_toolkit(sandbox_service: SandboxService, git_service: GitService) ->
     return [
         AnalyzeRepositoryTool(sandbox_service, git_service),
         ReadFileTool(git_service, sandbox_service),
+        ReadFilesTool(git_service, sandbox_service),
         WriteFileTool(git_service, sandbox_service),
         CreateBranchTool(git_service, sandbox_service),
         CommitChangesTool(git_service, sandbox_service),
         PushChangesTool(git_service, sandbox_service),
+        CommitAndPushTool(git_service, sandbox_service),
         ExecuteCommandTool(sandbox_service)
     ] 
\ No newline at end of file
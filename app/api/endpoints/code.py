@@ -3,10 +3,11 @@ Main /code endpoint for the Backspace Coding Agent.
 """
 
 import asyncio
+import functools
 from typing import Optional
 import time
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import StreamingResponse
 
 from app.core.config import settings
@@ -15,12 +16,12 @@ from app.core.security import (
     validate_prompt,
     sanitize_branch_name,
     create_correlation_id,
-    check_rate_limit,
+    check_shared_rate_limit,
     validate_environment_security,
     InputValidationError,
     SecurityError
 )
-from app.core.telemetry import get_telemetry
+from app.core.telemetry import correlation_id_var, get_telemetry
 from app.models.schemas import CodeRequest, StreamEvent, StreamEventType
 from app.services.streaming import get_streaming_service
 from app.services.sandbox import SandboxService
@@ -31,8 +32,22 @@ telemetry = get_telemetry()
 
 streaming_service = get_streaming_service()
 
+# Rate-limit settings, read once so /code doesn't go through the settings model per request
+_RATE_LIMIT_REQUESTS = settings.rate_limit_requests
+_RATE_LIMIT_WINDOW = settings.rate_limit_window
+
+# Strong references to running workflow tasks; the event loop only keeps weak ones
+_workflow_tasks: set = set()
+
+# Shared agent instance, created by get_agent_service_instance()
+_agent_instance = None
+
+# app.main.get_sandbox_service, bound by get_sandbox_service_instance() on first call
+_app_sandbox_service_getter = None
+
+@functools.lru_cache(maxsize=1)
 def get_git_service_instance():
-    """Get git service instance with lazy initialization."""
+    """Get the git service instance, created once per process on first use."""
     GitService = get_git_service()
     if GitService is None:
         raise HTTPException(
@@ -41,20 +56,35 @@ def get_git_service_instance():
         )
     return GitService()
 
-def get_agent_service_instance(streaming_service=None):
-    """Get LangGraph agent service instance with lazy initialization."""
-    AgentService = get_agent_service()
-    if AgentService is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Agent service not available - missing dependencies"
+def get_agent_service_instance(streaming_service=None, sandbox_service=None):
+    """
+    Get the LangGraph agent service instance, creating it on first use.
+    
+    The agent keeps per-workflow state keyed by correlation ID, so one instance
+    (with its compiled graph, LLM client and services) serves every request.
+    """
+    global _agent_instance
+    if _agent_instance is None:
+        AgentService = get_agent_service()
+        if AgentService is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Agent service not available - missing dependencies"
+            )
+        _agent_instance = AgentService(
+            streaming_service=streaming_service,
+            sandbox_service=sandbox_service
         )
-    return AgentService(streaming_service=streaming_service)
+    return _agent_instance
 
 def get_sandbox_service_instance():
     """Get sandbox service instance from main app."""
-    from app.main import get_sandbox_service
-    sandbox_service = get_sandbox_service()
+    global _app_sandbox_service_getter
+    if _app_sandbox_service_getter is None:
+        # app.main imports this module, so its accessor can only be resolved on first use
+        from app.main import get_sandbox_service
+        _app_sandbox_service_getter = get_sandbox_service
+    sandbox_service = _app_sandbox_service_getter()
     if sandbox_service is None:
         raise HTTPException(
             status_code=503,
@@ -62,7 +92,7 @@ def get_sandbox_service_instance():
         )
     return sandbox_service
 
-async def get_client_ip(request: Request) -> str:
+def get_client_ip(request: Request) -> str:
     """Get client IP address for rate limiting."""
     return request.client.host if request.client else "unknown"
 
@@ -70,9 +100,7 @@ async def get_client_ip(request: Request) -> str:
 @router.post("/code")
 async def create_code_changes(
     request: Request,
-    code_request: CodeRequest,
-    background_tasks: BackgroundTasks,
-    client_ip: str = Depends(get_client_ip)
+    code_request: CodeRequest
 ):
     """
     Create code changes based on a natural language prompt using LangGraph.
@@ -83,28 +111,29 @@ async def create_code_changes(
     Args:
         request: FastAPI request object
         code_request: Request payload
-        background_tasks: Background tasks manager (unused now)
-        client_ip: Client IP address
         
     Returns:
         StreamingResponse with Server-Sent Events
     """
-    correlation_id = getattr(request.state, "correlation_id", create_correlation_id())
+    correlation_id = getattr(request.state, "correlation_id", None) or create_correlation_id()
+    # Logged by every telemetry call below and inherited by the workflow task
+    correlation_id_var.set(correlation_id)
+    # Read inline rather than as a Depends() dependency resolved on every request
+    client_ip = get_client_ip(request)
     
     sandbox_service_instance = get_sandbox_service_instance()
     
     telemetry.log_event(
         "LangGraph code request received",
-        correlation_id=correlation_id,
         repo_url=code_request.repo_url,
         prompt_length=len(code_request.prompt),
         client_ip=client_ip
     )
     
-    if not check_rate_limit(
+    if not await check_shared_rate_limit(
         client_ip, 
-        settings.rate_limit_requests, 
-        settings.rate_limit_window
+        _RATE_LIMIT_REQUESTS, 
+        _RATE_LIMIT_WINDOW
     ):
         raise HTTPException(
             status_code=429,
@@ -114,7 +143,7 @@ async def create_code_changes(
     try:
         validate_environment_security()
     except SecurityError as e:
-        telemetry.log_error(e, correlation_id=correlation_id)
+        telemetry.log_error(e)
         raise HTTPException(
             status_code=500,
             detail="Service configuration error. Please contact support."
@@ -127,7 +156,7 @@ async def create_code_changes(
             code_request.branch_name or f"backspace-agent-{correlation_id[:8]}"
         )
     except InputValidationError as e:
-        telemetry.log_error(e, correlation_id=correlation_id)
+        telemetry.log_error(e)
         raise HTTPException(status_code=422, detail=str(e))
     
     try:
@@ -136,34 +165,24 @@ async def create_code_changes(
             request=request
         )
         
-        active_connections = streaming_service.get_active_connections()
-        telemetry.log_event(
-            "Event stream created for LangGraph workflow",
-            correlation_id=correlation_id,
-            active_connections=list(active_connections.keys()),
-            connection_count=len(active_connections)
-        )
-        
-        # Start the LangGraph workflow task
-        asyncio.create_task(
+        # Start the LangGraph workflow task on the running loop
+        task = asyncio.create_task(
             process_langgraph_request(
-            correlation_id=correlation_id,
-            repo_url=sanitized_repo_url,
-            prompt=sanitized_prompt,
-            branch_name=sanitized_branch_name,
-                ai_provider=code_request.ai_provider or "openai"
+                correlation_id=correlation_id,
+                repo_url=sanitized_repo_url,
+                prompt=sanitized_prompt,
+                branch_name=sanitized_branch_name,
+                ai_provider=code_request.ai_provider or "openai",
+                sandbox_service=sandbox_service_instance
             )
         )
-        
-        telemetry.log_event(
-            "LangGraph workflow task started",
-            correlation_id=correlation_id
-        )
+        _workflow_tasks.add(task)
+        task.add_done_callback(_workflow_tasks.discard)
         
         return response
         
     except Exception as e:
-        telemetry.log_error(e, correlation_id=correlation_id)
+        telemetry.log_error(e)
         raise HTTPException(
             status_code=500,
             detail="Failed to create streaming response"
@@ -175,7 +194,8 @@ async def process_langgraph_request(
     repo_url: str,
     prompt: str,
     branch_name: str,
-    ai_provider: str
+    ai_provider: str,
+    sandbox_service: Optional[SandboxService] = None
 ):
     """
     Process the code request using LangGraph workflow.
@@ -186,20 +206,13 @@ async def process_langgraph_request(
         prompt: Coding prompt
         branch_name: Branch name for changes
         ai_provider: AI provider to use
+        sandbox_service: Application sandbox service resolved by the endpoint
     """
-    start_time = asyncio.get_event_loop().time()
+    start_time = time.monotonic()
     
     try:
-        telemetry.log_event(
-            "LangGraph workflow started",
-            correlation_id=correlation_id,
-            repo_url=repo_url,
-            prompt_length=len(prompt),
-            ai_provider=ai_provider
-        )
-        
         # Initialize the LangGraph agent with streaming support
-        agent = get_agent_service_instance(streaming_service)
+        agent = get_agent_service_instance(streaming_service, sandbox_service)
         
         # Run the LangGraph agent workflow with streaming
         result = await agent.run(
@@ -231,7 +244,7 @@ async def process_langgraph_request(
                     "changes_made": changes_made,
                     "push_success": push_success,
                     "workflow": "langgraph",
-                    "duration": asyncio.get_event_loop().time() - start_time
+                    "duration": time.monotonic() - start_time
                 }
             )
         else:
@@ -243,10 +256,13 @@ async def process_langgraph_request(
                 context={"workflow": "langgraph"}
         )
         
-        duration = asyncio.get_event_loop().time() - start_time
+        # One lifecycle event per workflow instead of separate started/completed breadcrumbs
+        duration = time.monotonic() - start_time
         telemetry.log_event(
             "LangGraph workflow completed",
-            correlation_id=correlation_id,
+            repo_url=repo_url,
+            prompt_length=len(prompt),
+            ai_provider=ai_provider,
             duration=duration,
             success=result.get("success", False),
             pr_url=pr_url,
@@ -256,7 +272,7 @@ async def process_langgraph_request(
         )
         
     except Exception as e:
-        telemetry.log_error(e, correlation_id=correlation_id)
+        telemetry.log_error(e)
         await streaming_service.send_error(
             correlation_id=correlation_id,
             error=str(e),
@@ -279,13 +295,13 @@ async def get_status(correlation_id: str):
         Status information
     """
     try:
-        connections = streaming_service.get_active_connections()
+        connection_info = streaming_service.get_connection_info(correlation_id)
         
-        if correlation_id in connections:
+        if connection_info is not None:
             return {
                 "status": "active",
                 "correlation_id": correlation_id,
-                "connection_info": connections[correlation_id]
+                "connection_info": connection_info
             }
         else:
             return {
@@ -53,6 +53,7 @@ class Settings(BaseSettings):
     # Rate Limiting
     rate_limit_requests: int = Field(default=10, description="Rate limit requests per minute")
     rate_limit_window: int = Field(default=60, description="Rate limit window in seconds")
+    redis_url: Optional[str] = Field(default=None, description="Redis URL for rate limits shared across workers")
     
     # LangSmith Configuration
     langsmith_api_key: Optional[str] = Field(default=None, description="LangSmith API Key")
@@ -2,13 +2,28 @@
 Security utilities for the Backspace Coding Agent.
 """
 
+import functools
 import re
+import time
 import urllib.parse
-from typing import Optional
+import uuid
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
 from fastapi import HTTPException, status
 
+from app.core.config import settings
+from app.core.telemetry import get_telemetry
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+telemetry = get_telemetry()
+
 
 class SecurityError(Exception):
     """Base exception for security-related errors."""
@@ -20,10 +35,88 @@ class InputValidationError(SecurityError):
     pass
 
 
+# Potentially dangerous shell commands rejected in prompts
+_DANGEROUS_PROMPT_PATTERNS = (
+    r"\brm\s+-rf\b",
+    r"\bsudo\b",
+    r"\bchmod\s+777\b",
+    r"\bcurl\s+.*\|\s*sh\b",
+    r"\bwget\s+.*\|\s*sh\b",
+    r"\bdd\s+if=",
+    r"\b/dev/",
+    r"\bfork\s*\(\s*\)",
+    r"while\s*\(\s*1\s*\)",
+    r":\(\)\{\s*:\|:&\s*\};:",  # Fork bomb
+)
+
+# All dangerous patterns compiled once into a single alternation, so a prompt is scanned in one search
+_DANGEROUS_PROMPT_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in _DANGEROUS_PROMPT_PATTERNS),
+    re.IGNORECASE
+)
+
+# GitHub owner / repository name
+_GITHUB_NAME_RE = re.compile(r"^[a-zA-Z0-9._-]+$")
+
+# Hosts accepted for repository URLs
+_GITHUB_HOSTS = frozenset({"github.com", "www.github.com"})
+
+# URL prefixes whose path can be read without urlparse (when there's no query, fragment or params)
+_GITHUB_URL_PREFIXES = ("https://github.com/", "https://www.github.com/")
+
+# Path fragments validate_file_path refuses to touch
+_DANGEROUS_PATHS = (
+    "/etc/",
+    "/var/",
+    "/sys/",
+    "/proc/",
+    "/dev/",
+    "/root/",
+    "/home/",
+    ".ssh/",
+    ".git/",
+)
+
+# Characters replaced with "-" by sanitize_branch_name
+_BRANCH_NAME_INVALID_CHARS_RE = re.compile(r"[^a-zA-Z0-9._/-]")
+
+# client_id -> (tokens left, time.monotonic() of the last refill) for check_rate_limit
+_rate_limit_buckets: Dict[str, Tuple[float, float]] = {}
+
+# Buckets idle for this many windows are dropped; a dropped client starts again with a full bucket
+_RATE_LIMIT_IDLE_WINDOWS = 10
+
+# Seconds between sweeps of idle buckets, and time.monotonic() of the last one
+_RATE_LIMIT_SWEEP_INTERVAL = 60.0
+_rate_limit_last_sweep = 0.0
+
+# Sliding-window limit over a sorted set of request timestamps (ms), applied atomically in Redis.
+# KEYS[1] = bucket key; ARGV = now_ms, window_ms, limit, unique member
+_SLIDING_WINDOW_LUA = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[2]))
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Connect/read timeout (seconds) for the rate-limit Redis client; past it we fall back to the local check
+_REDIS_TIMEOUT_SECONDS = 0.2
+
+# Lazily created Redis client and registered script used by check_shared_rate_limit
+_redis_client: Any = None
+_sliding_window_script: Any = None
+
+
+@functools.lru_cache(maxsize=1024)
 def validate_github_url(url: str) -> str:
     """
     Validate and sanitize a GitHub repository URL.
     
+    Results are cached per URL; invalid URLs raise on every call.
+    
     Args:
         url: The GitHub repository URL to validate
         
@@ -36,21 +129,29 @@ def validate_github_url(url: str) -> str:
     if not url or not isinstance(url, str):
         raise InputValidationError("Repository URL is required")
     
-    try:
-        parsed = urlparse(url.strip())
-    except Exception as e:
-        raise InputValidationError(f"Invalid URL format: {e}")
-    
-    # Check if it's a GitHub URL
-    if parsed.netloc.lower() not in ["github.com", "www.github.com"]:
-        raise InputValidationError("Only GitHub repositories are supported")
+    url = url.strip()
     
-    # Check if it's HTTPS
-    if parsed.scheme != "https":
-        raise InputValidationError("Only HTTPS URLs are supported")
+    if url.startswith(_GITHUB_URL_PREFIXES) and not any(c in url for c in "?#;"):
+        # Common case: scheme and host are already known good, the rest is the path
+        path = url[url.index("/", len("https://")):]
+    else:
+        try:
+            parsed = urlparse(url)
+        except Exception as e:
+            raise InputValidationError(f"Invalid URL format: {e}")
+        
+        # Check if it's a GitHub URL
+        if parsed.netloc.lower() not in _GITHUB_HOSTS:
+            raise InputValidationError("Only GitHub repositories are supported")
+        
+        # Check if it's HTTPS
+        if parsed.scheme != "https":
+            raise InputValidationError("Only HTTPS URLs are supported")
+        
+        path = parsed.path
     
     # Validate path format (should be /owner/repo or /owner/repo.git)
-    path_parts = parsed.path.strip("/").split("/")
+    path_parts = path.strip("/").split("/")
     if len(path_parts) < 2:
         raise InputValidationError("Invalid GitHub repository URL format")
     
@@ -61,12 +162,16 @@ def validate_github_url(url: str) -> str:
         repo = repo[:-4]
     
     # Validate owner and repo names
-    if not re.match(r"^[a-zA-Z0-9._-]+$", owner):
+    if not _GITHUB_NAME_RE.match(owner):
         raise InputValidationError("Invalid repository owner name")
     
-    if not re.match(r"^[a-zA-Z0-9._-]+$", repo):
+    if not _GITHUB_NAME_RE.match(repo):
         raise InputValidationError("Invalid repository name")
     
+    # Already canonical (https://github.com/owner/repo.git, nothing extra): return as-is
+    if url.endswith(".git") and path.count("/") == 2 and url == "https://github.com" + path:
+        return url
+    
     # Return sanitized URL
     return f"https://github.com/{owner}/{repo}.git"
 
@@ -96,22 +201,8 @@ def validate_prompt(prompt: str) -> str:
         raise InputValidationError("Prompt must be less than 2000 characters")
     
     # Check for potentially dangerous commands
-    dangerous_patterns = [
-        r"\brm\s+-rf\b",
-        r"\bsudo\b",
-        r"\bchmod\s+777\b",
-        r"\bcurl\s+.*\|\s*sh\b",
-        r"\bwget\s+.*\|\s*sh\b",
-        r"\bdd\s+if=",
-        r"\b/dev/",
-        r"\bfork\s*\(\s*\)",
-        r"while\s*\(\s*1\s*\)",
-        r":\(\)\{\s*:\|:&\s*\};:",  # Fork bomb
-    ]
-    
-    for pattern in dangerous_patterns:
-        if re.search(pattern, prompt, re.IGNORECASE):
-            raise InputValidationError("Prompt contains potentially dangerous commands")
+    if _DANGEROUS_PROMPT_RE.search(prompt):
+        raise InputValidationError("Prompt contains potentially dangerous commands")
     
     return prompt
 
@@ -132,28 +223,19 @@ def validate_file_path(file_path: str) -> str:
     if not file_path or not isinstance(file_path, str):
         raise InputValidationError("File path is required")
     
-    # Normalize the path
-    normalized = urllib.parse.unquote(file_path.strip())
+    # Normalize the path (only percent-encoded paths need decoding)
+    normalized = file_path.strip()
+    if "%" in normalized:
+        normalized = urllib.parse.unquote(normalized)
     
     # Check for directory traversal attempts
     if ".." in normalized or normalized.startswith("/"):
         raise InputValidationError("Invalid file path: directory traversal detected")
     
     # Check for dangerous paths
-    dangerous_paths = [
-        "/etc/",
-        "/var/",
-        "/sys/",
-        "/proc/",
-        "/dev/",
-        "/root/",
-        "/home/",
-        ".ssh/",
-        ".git/",
-    ]
-    
-    for dangerous_path in dangerous_paths:
-        if dangerous_path in normalized.lower():
+    lowered = normalized.lower()
+    for dangerous_path in _DANGEROUS_PATHS:
+        if dangerous_path in lowered:
             raise InputValidationError(f"Access to {dangerous_path} is not allowed")
     
     return normalized
@@ -172,7 +254,7 @@ def sanitize_branch_name(branch_name: str) -> str:
     if not branch_name or not isinstance(branch_name, str):
         return "feature/auto-generated"
     
-    sanitized = re.sub(r"[^a-zA-Z0-9._/-]", "-", branch_name.strip())
+    sanitized = _BRANCH_NAME_INVALID_CHARS_RE.sub("-", branch_name.strip())
     
     sanitized = sanitized.strip("-/")
     
@@ -195,8 +277,7 @@ def create_correlation_id() -> str:
     Returns:
         A unique correlation ID
     """
-    import uuid
-    return str(uuid.uuid4())
+    return uuid.uuid4().hex
 
 
 def validate_environment_security() -> None:
@@ -206,8 +287,6 @@ def validate_environment_security() -> None:
     Raises:
         SecurityError: If required security settings are missing
     """
-    from app.core.config import settings
-    
     if not settings.github_token:
         raise SecurityError("GitHub token is required but not configured")
     
@@ -219,6 +298,11 @@ def check_rate_limit(client_id: str, limit: int = 10, window: int = 60) -> bool:
     """
     Check if a client has exceeded the rate limit.
     
+    Uses a token bucket per client: it holds up to ``limit`` tokens and refills
+    at ``limit / window`` tokens per second, so each check is O(1). Buckets idle
+    for more than ``_RATE_LIMIT_IDLE_WINDOWS`` windows are reset on access and
+    removed by a sweep that runs at most once per ``_RATE_LIMIT_SWEEP_INTERVAL``.
+    
     Args:
         client_id: Unique identifier for the client
         limit: Maximum number of requests allowed
@@ -227,19 +311,82 @@ def check_rate_limit(client_id: str, limit: int = 10, window: int = 60) -> bool:
     Returns:
         True if the request is within the rate limit, False otherwise
     """
-    import time
-    from collections import defaultdict
+    global _rate_limit_last_sweep
+    
+    now = time.monotonic()
+    idle_after = window * _RATE_LIMIT_IDLE_WINDOWS
+    
+    # Occasionally drop idle buckets so the table doesn't keep every client ever seen
+    if now - _rate_limit_last_sweep > _RATE_LIMIT_SWEEP_INTERVAL:
+        _rate_limit_last_sweep = now
+        for stale_id in [
+            cid for cid, (_, last) in _rate_limit_buckets.items() if now - last > idle_after
+        ]:
+            del _rate_limit_buckets[stale_id]
+    
+    tokens, last_refill = _rate_limit_buckets.get(client_id, (float(limit), now))
+    if now - last_refill > idle_after:
+        tokens, last_refill = float(limit), now
+    tokens = min(float(limit), tokens + (now - last_refill) * limit / window)
+    
+    if tokens < 1.0:
+        _rate_limit_buckets[client_id] = (tokens, now)
+        return False
     
-    if not hasattr(check_rate_limit, "requests"):
-        check_rate_limit.requests = defaultdict(list)
+    _rate_limit_buckets[client_id] = (tokens - 1.0, now)
+    return True
+
+
+async def check_shared_rate_limit(client_id: str, limit: int = 10, window: int = 60) -> bool:
+    """
+    Check the rate limit in Redis so it is shared by every worker and replica.
     
-    now = time.time()
-    client_requests = check_rate_limit.requests[client_id]
+    Falls back to the in-process check_rate_limit when Redis is not installed,
+    not configured (``settings.redis_url``) or unreachable.
     
-    client_requests[:] = [req_time for req_time in client_requests if now - req_time < window]
+    Args:
+        client_id: Unique identifier for the client
+        limit: Maximum number of requests allowed
+        window: Time window in seconds
+        
+    Returns:
+        True if the request is within the rate limit, False otherwise
+    """
+    global _redis_client, _sliding_window_script
     
-    if len(client_requests) >= limit:
-        return False
+    if not REDIS_AVAILABLE or not settings.redis_url:
+        return check_rate_limit(client_id, limit, window)
+    
+    if _redis_client is None:
+        _redis_client = aioredis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+            socket_timeout=_REDIS_TIMEOUT_SECONDS
+        )
+        # register_script runs EVALSHA and reloads the script if Redis lost it
+        _sliding_window_script = _redis_client.register_script(_SLIDING_WINDOW_LUA)
+    
+    now_ms = int(time.time() * 1000)
+    try:
+        allowed = await _sliding_window_script(
+            keys=[f"rl:{client_id}"],
+            args=[now_ms, window * 1000, limit, f"{now_ms}:{uuid.uuid4().hex}"]
+        )
+    except Exception as e:
+        telemetry.log_event(
+            "Shared rate limit unavailable, falling back to per-process limit",
+            level="warning",
+            error=str(e),
+            error_type=type(e).__name__
+        )
+        return check_rate_limit(client_id, limit, window)
+    return allowed == 1
+
+
+async def close_shared_rate_limit() -> None:
+    """Close the Redis client used by check_shared_rate_limit, if one was created."""
+    global _redis_client, _sliding_window_script
     
-    client_requests.append(now)
-    return True 
\ No newline at end of file
+    if _redis_client is not None:
+        client, _redis_client, _sliding_window_script = _redis_client, None, None
+        await client.aclose()
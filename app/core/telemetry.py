@@ -4,13 +4,22 @@ Telemetry and observability utilities for the Backspace Coding Agent.
 
 import logging
 import time
+from collections import Counter
 from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any, Dict, Optional
 
 import structlog
 
 from app.core.config import settings
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 try:
     from opentelemetry import trace
     from opentelemetry.exporter.jaeger.thrift import JaegerExporter
@@ -23,6 +32,26 @@ except ImportError:
     trace = None
 
 
+# Correlation ID of the workflow running in the current task; used when callers don't pass one
+correlation_id_var: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+
+def _add_correlation_id(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Structlog processor filling in correlation_id from correlation_id_var when not passed."""
+    if event_dict.get("correlation_id") is None:
+        event_dict["correlation_id"] = correlation_id_var.get()
+    return event_dict
+
+
+def _orjson_serializer(obj: Any, **kwargs: Any) -> str:
+    """Serialize a log event with orjson; used by JSONRenderer when orjson is installed."""
+    return orjson.dumps(
+        obj,
+        default=kwargs.get("default", str),
+        option=orjson.OPT_NON_STR_KEYS,
+    ).decode()
+
+
 # Configure structured logging
 def configure_logging() -> None:
     """Configure structured logging for the application."""
@@ -31,17 +60,25 @@ def configure_logging() -> None:
         level=getattr(logging, settings.log_level.upper()),
     )
     
+    if settings.log_format != "json":
+        renderer = structlog.dev.ConsoleRenderer()
+    elif ORJSON_AVAILABLE:
+        renderer = structlog.processors.JSONRenderer(serializer=_orjson_serializer)
+    else:
+        renderer = structlog.processors.JSONRenderer()
+    
     structlog.configure(
         processors=[
             structlog.stdlib.filter_by_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.add_log_level,
+            _add_correlation_id,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer() if settings.log_format == "json" else structlog.dev.ConsoleRenderer(),
+            renderer,
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -83,6 +120,15 @@ configure_tracing()
 logger = structlog.get_logger()
 tracer = trace.get_tracer(__name__) if OTEL_AVAILABLE and trace else None
 
+# Standard logging level for each log_event level name
+_LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
 
 class TelemetryManager:
     """Manages telemetry for the application."""
@@ -90,7 +136,16 @@ class TelemetryManager:
     def __init__(self):
         self.logger = logger
         self.tracer = tracer
-        self.metrics = {}
+        # Bound log method for each log_event level name
+        self._level_funcs = {
+            "debug": logger.debug,
+            "info": logger.info,
+            "warning": logger.warning,
+            "error": logger.error,
+            "critical": logger.critical,
+        }
+        # Counter values keyed by (metric name, sorted label items)
+        self.metrics: Counter = Counter()
     
     def log_event(
         self,
@@ -104,15 +159,18 @@ class TelemetryManager:
         
         Args:
             event: The event name
-            level: Log level
-            correlation_id: Correlation ID for request tracing
+            level: Log level name, lowercase ("debug", "info", "warning", "error" or "critical")
+            correlation_id: Correlation ID for request tracing (defaults to correlation_id_var)
             **kwargs: Additional context
         """
-        log_func = getattr(self.logger, level.lower(), self.logger.info)
+        # Skip the processor chain (and the kwargs it would render) for filtered-out levels
+        if not self.logger.isEnabledFor(_LOG_LEVELS.get(level, logging.INFO)):
+            return
+        
+        log_func = self._level_funcs.get(level, self.logger.info)
         log_func(
             event,
             correlation_id=correlation_id,
-            timestamp=time.time(),
             **kwargs,
         )
     
@@ -128,7 +186,7 @@ class TelemetryManager:
         Args:
             error: The exception to log
             context: Additional context
-            correlation_id: Correlation ID for request tracing
+            correlation_id: Correlation ID for request tracing (defaults to correlation_id_var)
         """
         self.logger.error(
             "Error occurred",
@@ -136,7 +194,6 @@ class TelemetryManager:
             error_type=type(error).__name__,
             context=context or {},
             correlation_id=correlation_id,
-            timestamp=time.time(),
             exc_info=True,
         )
     
@@ -153,7 +210,7 @@ class TelemetryManager:
         Args:
             operation: The operation name
             duration: Duration in seconds
-            correlation_id: Correlation ID for request tracing
+            correlation_id: Correlation ID for request tracing (defaults to correlation_id_var)
             **kwargs: Additional metrics
         """
         self.logger.info(
@@ -161,7 +218,6 @@ class TelemetryManager:
             operation=operation,
             duration=duration,
             correlation_id=correlation_id,
-            timestamp=time.time(),
             **kwargs,
         )
     
@@ -208,15 +264,13 @@ class TelemetryManager:
             value: Value to increment by
             **labels: Additional labels
         """
-        key = f"{metric_name}_{hash(frozenset(labels.items()))}"
-        self.metrics[key] = self.metrics.get(key, 0) + value
+        self.metrics[(metric_name, tuple(sorted(labels.items())))] += value
         
         self.logger.info(
             "Metric incremented",
             metric=metric_name,
             value=value,
             labels=labels,
-            timestamp=time.time(),
         )
     
     def record_histogram(self, metric_name: str, value: float, **labels: Any) -> None:
@@ -233,12 +287,14 @@ class TelemetryManager:
             metric=metric_name,
             value=value,
             labels=labels,
-            timestamp=time.time(),
         )
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get current metrics."""
-        return self.metrics.copy()
+        """Get current metrics, keyed as ``name{label=value,...}``."""
+        return {
+            f"{name}{{{','.join(f'{k}={v}' for k, v in labels)}}}" if labels else name: count
+            for (name, labels), count in self.metrics.items()
+        }
 
 telemetry = TelemetryManager()
 
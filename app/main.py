@@ -2,18 +2,30 @@
 Main FastAPI application for the Backspace Coding Agent.
 """
 
-import asyncio
 from contextlib import asynccontextmanager
 import os
+import time
+from typing import Optional
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 
+try:
+    import orjson  # noqa: F401 - ORJSONResponse needs it at render time
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from app.core.config import settings
-from app.core.security import SecurityError, InputValidationError
+from app.core.security import (
+    SecurityError,
+    InputValidationError,
+    create_correlation_id,
+    close_shared_rate_limit
+)
 from app.core.telemetry import get_telemetry
 from app.models.schemas import ErrorResponse, HealthCheck
 from app.services.sandbox import SandboxService
@@ -59,6 +71,8 @@ async def lifespan(app: FastAPI):
             if sandbox_service:
                 await sandbox_service.cleanup_all_sandboxes()
             
+            await close_shared_rate_limit()
+            
             telemetry.log_event("Application shutdown complete")
             
         except Exception as e:
@@ -71,6 +85,7 @@ app = FastAPI(
     version=settings.app_version,
     description="A sandboxed coding agent that creates pull requests from natural language prompts",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
 )
@@ -92,8 +107,6 @@ app.add_middleware(
 @app.middleware("http")
 async def logging_middleware(request: Request, call_next):
     """Log all requests with correlation IDs."""
-    from app.core.security import create_correlation_id
-    
     correlation_id = create_correlation_id()
     
     # Add correlation ID to request state
@@ -109,13 +122,13 @@ async def logging_middleware(request: Request, call_next):
         client_ip=request.client.host if request.client else ""
     )
     
-    start_time = asyncio.get_event_loop().time()
+    start_time = time.perf_counter()
     
     try:
         response = await call_next(request)
         
         # Log response
-        duration = asyncio.get_event_loop().time() - start_time
+        duration = time.perf_counter() - start_time
         telemetry.log_performance(
             "Request completed",
             duration=duration,
@@ -132,7 +145,7 @@ async def logging_middleware(request: Request, call_next):
         
     except Exception as e:
         # Log error
-        duration = asyncio.get_event_loop().time() - start_time
+        duration = time.perf_counter() - start_time
         telemetry.log_error(
             e,
             context={
@@ -146,6 +159,31 @@ async def logging_middleware(request: Request, call_next):
         raise
 
 
+def _error_json_response(
+    status_code: int,
+    error_response: ErrorResponse,
+    correlation_id: Optional[str] = None
+) -> JSONResponse:
+    """
+    Build the JSON response returned by the exception handlers.
+    
+    orjson encodes the timestamp natively, so the model is only converted to
+    JSON-safe types for the stdlib fallback.
+    """
+    headers = {"X-Correlation-ID": correlation_id} if correlation_id else {}
+    if ORJSON_AVAILABLE:
+        return ORJSONResponse(
+            status_code=status_code,
+            content=error_response.model_dump(),
+            headers=headers
+        )
+    return JSONResponse(
+        status_code=status_code,
+        content=error_response.model_dump(mode='json'),
+        headers=headers
+    )
+
+
 # Global exception handlers
 @app.exception_handler(SecurityError)
 async def security_error_handler(request: Request, exc: SecurityError):
@@ -164,11 +202,7 @@ async def security_error_handler(request: Request, exc: SecurityError):
         correlation_id=correlation_id
     )
     
-    return JSONResponse(
-        status_code=403,
-        content=error_response.model_dump(mode='json'),
-        headers={"X-Correlation-ID": correlation_id} if correlation_id else {}
-    )
+    return _error_json_response(403, error_response, correlation_id)
 
 
 @app.exception_handler(InputValidationError)
@@ -188,11 +222,7 @@ async def validation_error_handler(request: Request, exc: InputValidationError):
         correlation_id=correlation_id
     )
     
-    return JSONResponse(
-        status_code=422,
-        content=error_response.model_dump(mode='json'),
-        headers={"X-Correlation-ID": correlation_id} if correlation_id else {}
-    )
+    return _error_json_response(422, error_response, correlation_id)
 
 
 @app.exception_handler(HTTPException)
@@ -216,11 +246,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         correlation_id=correlation_id
     )
     
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=error_response.model_dump(mode='json'),
-        headers={"X-Correlation-ID": correlation_id} if correlation_id else {}
-    )
+    return _error_json_response(exc.status_code, error_response, correlation_id)
 
 
 @app.exception_handler(Exception)
@@ -241,11 +267,7 @@ async def general_exception_handler(request: Request, exc: Exception):
         context={"message": str(exc)} if settings.debug else None
     )
     
-    return JSONResponse(
-        status_code=500,
-        content=error_response.model_dump(mode='json'),
-        headers={"X-Correlation-ID": correlation_id} if correlation_id else {}
-    )
+    return _error_json_response(500, error_response, correlation_id)
 
 
 # Health check endpoint
@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, Field, HttpUrl, validator
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 
 
 class StreamEventType(str, Enum):
@@ -51,14 +51,16 @@ class CodeRequest(BaseModel):
         example="openai"
     )
     
-    @validator("repo_url")
+    @field_validator("repo_url")
+    @classmethod
     def validate_repo_url(cls, v):
         """Validate the repository URL."""
         if not v.startswith("https://github.com/"):
             raise ValueError("Only GitHub repositories are supported")
         return v
     
-    @validator("ai_provider")
+    @field_validator("ai_provider")
+    @classmethod
     def validate_ai_provider(cls, v):
         """Validate the AI provider."""
         if v is not None and v not in ["openai", "anthropic"]:
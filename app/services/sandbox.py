@@ -255,7 +255,10 @@ class SandboxService:
                 user = "root" if "apk" in command or "apt-get" in command else "1000:1000"
             
             try:    
-                exec_result = container.exec_run(
+                # exec_run blocks on the Docker API; run it in a worker thread so
+                # concurrent sandbox calls (e.g. gathered file reads) actually overlap
+                exec_result = await asyncio.to_thread(
+                    container.exec_run,
                     command,
                     stdout=True,
                     stderr=True,
@@ -294,7 +297,8 @@ class SandboxService:
     async def read_file(
         self,
         correlation_id: str,
-        file_path: str
+        file_path: str,
+        max_bytes: Optional[int] = None
     ) -> str:
         """
         Read a file from the sandbox.
@@ -302,6 +306,7 @@ class SandboxService:
         Args:
             correlation_id: Sandbox identifier
             file_path: Path to the file to read
+            max_bytes: Only read this many leading bytes (optional)
             
         Returns:
             File contents as string
@@ -314,9 +319,15 @@ class SandboxService:
             correlation_id=correlation_id,
             file_path=file_path
         ):
+            # Truncate inside the container so large files never cross the exec boundary
+            if max_bytes is not None:
+                command = f"head -c {int(max_bytes)} '{file_path}'"
+            else:
+                command = f"cat '{file_path}'"
+            
             stdout, stderr, exit_code = await self.execute_command(
                 correlation_id=correlation_id,
-                command=f"cat '{file_path}'"
+                command=command
             )
             
             if exit_code != 0:
@@ -426,7 +437,7 @@ class SandboxService:
             if exit_code != 0:
                 raise SandboxError(f"Failed to list files in {directory}: {stderr}")
             
-            return [line.strip() for line in stdout.split("\n") if line.strip()]
+            return [path for path in map(str.strip, stdout.splitlines()) if path]
     
     async def get_metrics(self, correlation_id: str) -> SandboxMetrics:
         """
@@ -514,13 +525,13 @@ class SandboxService:
             temp_dir = container_info["temp_dir"]
             
             try:
-                # Stop and remove container
-                container.stop(timeout=5)
-                container.remove()
+                # Stop and remove container (blocking Docker API calls, so off the event loop)
+                await asyncio.to_thread(container.stop, timeout=5)
+                await asyncio.to_thread(container.remove)
                 
                 # Remove temporary directory
                 if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir, ignore_errors=True)
+                    await asyncio.to_thread(shutil.rmtree, temp_dir, ignore_errors=True)
                 
                 # Remove from active containers
                 del self.active_containers[correlation_id]
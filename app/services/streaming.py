@@ -4,16 +4,25 @@ Streaming service for Server-Sent Events.
 
 import asyncio
 import json
-import time
 from typing import AsyncGenerator, Dict, Any, Optional
 
 from fastapi import Request
 from sse_starlette.sse import EventSourceResponse
-import janus
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from app.core.telemetry import get_telemetry
 from app.models.schemas import StreamEvent, StreamEventType
 
+# Interval between SSE comment pings that keep idle streams open through proxies
+_KEEPALIVE_PING_SECONDS = 15
+
+# Most events buffered per stream; when a client stops reading, the oldest are dropped
+_STREAM_QUEUE_MAX_EVENTS = 256
+
 # Singleton instance and getter
 _streaming_service_instance = None
 
@@ -25,11 +34,14 @@ def get_streaming_service():
     return _streaming_service_instance
 
 class StreamingService:
-    """Service for handling Server-Sent Events streaming. Singleton pattern enforced via get_streaming_service(). Uses janus.Queue for thread-safe cross-event-loop streaming."""
+    """Service for handling Server-Sent Events streaming. Singleton pattern enforced via get_streaming_service(). Each connection has one asyncio.Queue, drained by its SSE response generator.
+    
+    The send_* helpers build events with StreamEvent.model_construct: their fields come from
+    internal callers with known types, so per-event validation is skipped."""
     
     def __init__(self):
         self.telemetry = get_telemetry()
-        self.active_connections: Dict[str, janus.Queue] = {}
+        self.active_connections: Dict[str, asyncio.Queue] = {}
     
     async def create_event_stream(
         self, 
@@ -37,7 +49,7 @@ class StreamingService:
         request: Request
     ) -> EventSourceResponse:
         """
-        Create a Server-Sent Events stream using janus.Queue for thread-safe event delivery.
+        Create a Server-Sent Events stream fed by a per-connection asyncio.Queue.
         
         Args:
             correlation_id: Unique identifier for the stream
@@ -46,76 +58,25 @@ class StreamingService:
         Returns:
             EventSourceResponse for streaming
         """
-        event_queue = janus.Queue()
+        event_queue: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_QUEUE_MAX_EVENTS)
         self.active_connections[correlation_id] = event_queue
         
-        # File-based debug output for stream creation
-        try:
-            with open(f"/tmp/streaming_create_{correlation_id[:8]}.txt", "w") as f:
-                f.write(f"{time.time()}: Event stream created for {correlation_id}\n")
-                f.write(f"Active connections count: {len(self.active_connections)}\n")
-        except Exception as debug_error:
-            print(f"DEBUG: Failed to write create debug file: {debug_error}")
-        
         async def event_generator() -> AsyncGenerator[str, None]:
             """Generate events for the stream."""
-            # File-based debug output for stream start
-            try:
-                with open(f"/tmp/streaming_start_{correlation_id[:8]}.txt", "w") as f:
-                    f.write(f"{time.time()}: Event generator started for {correlation_id}\n")
-                    f.write(f"Stream will stay open until explicitly closed\n")
-            except Exception as debug_error:
-                print(f"DEBUG: Failed to write start debug file: {debug_error}")
-            
             try:
                 while True:
-                    try:
-                        # Wait for next event with timeout
-                        event = await asyncio.wait_for(
-                            event_queue.async_q.get(), 
-                            timeout=1.0
-                        )
-                        print(f"[DEBUG] Event dequeued for {correlation_id}: {event}")
-                        
-                        # File-based debug output for event dequeue
-                        try:
-                            with open(f"/tmp/streaming_dequeue_{correlation_id[:8]}.txt", "a") as f:
-                                f.write(f"{time.time()}: Event dequeued for {correlation_id}\n")
-                                f.write(f"Event type: {event.type if event else 'None'}\n")
-                                f.write(f"Event message: {event.message if event else 'None'}\n")
-                                f.write(f"Queue size after get: {event_queue.async_q.qsize()}\n")
-                        except Exception as debug_error:
-                            print(f"DEBUG: Failed to write dequeue debug file: {debug_error}")
-                        
-                        # Check for stream termination
-                        if event is None:
-                            # File-based debug output for explicit termination
-                            try:
-                                with open(f"/tmp/streaming_terminate_{correlation_id[:8]}.txt", "w") as f:
-                                    f.write(f"{time.time()}: Stream explicitly terminated for {correlation_id}\n")
-                            except Exception as debug_error:
-                                print(f"DEBUG: Failed to write terminate debug file: {debug_error}")
-                            break
-                        
-                        # Serialize event
-                        event_data = self._serialize_event(event)
-                        yield event_data
-                        
-                    except asyncio.TimeoutError:
-                        # Send keepalive
-                        yield "data: {\"type\": \"keepalive\", \"timestamp\": \"" + \
-                              str(asyncio.get_event_loop().time()) + "\"}\n\n"
-                        
+                    # Block until the next event; idle keep-alives are EventSourceResponse pings
+                    event = await event_queue.get()
+                    
+                    # Check for stream termination
+                    if event is None:
+                        break
+                    
+                    # Serialize event
+                    event_data = self._serialize_event(event)
+                    yield event_data
+                    
             except Exception as e:
-                # File-based error debug output
-                try:
-                    with open(f"/tmp/streaming_dequeue_{correlation_id[:8]}_error.txt", "w") as f:
-                        f.write(f"{time.time()}: event_generator failed for {correlation_id}\n")
-                        f.write(f"Error: {str(e)}\n")
-                        f.write(f"Error type: {type(e).__name__}\n")
-                except Exception as debug_error:
-                    print(f"DEBUG: Failed to write dequeue error debug file: {debug_error}")
-                
                 self.telemetry.log_error(
                     e,
                     context={"correlation_id": correlation_id},
@@ -134,19 +95,11 @@ class StreamingService:
                 
             finally:
                 # Cleanup
-                if correlation_id in self.active_connections:
-                    self.active_connections[correlation_id].close()
-                    del self.active_connections[correlation_id]
-                    
-                    # File-based debug output for cleanup
-                    try:
-                        with open(f"/tmp/streaming_cleanup_{correlation_id[:8]}.txt", "w") as f:
-                            f.write(f"{time.time()}: Stream cleaned up for {correlation_id}\n")
-                    except Exception as debug_error:
-                        print(f"DEBUG: Failed to write cleanup debug file: {debug_error}")
+                self.active_connections.pop(correlation_id, None)
         
         return EventSourceResponse(
             event_generator(),
+            ping=_KEEPALIVE_PING_SECONDS,
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -170,27 +123,7 @@ class StreamingService:
         """
         if correlation_id in self.active_connections:
             try:
-                print(f"[DEBUG] Event enqueued for {correlation_id}: {event}")
-                
-                # File-based debug output
-                try:
-                    with open(f"/tmp/streaming_send_{correlation_id[:8]}.txt", "a") as f:
-                        f.write(f"{time.time()}: send_event called for {correlation_id}\n")
-                        f.write(f"Event type: {event.type}\n")
-                        f.write(f"Event message: {event.message}\n")
-                        f.write(f"Queue size before put: {self.active_connections[correlation_id].sync_q.qsize()}\n")
-                except Exception as debug_error:
-                    print(f"DEBUG: Failed to write send debug file: {debug_error}")
-                
-                self.active_connections[correlation_id].sync_q.put(event)
-                
-                # File-based debug output after put
-                try:
-                    with open(f"/tmp/streaming_send_{correlation_id[:8]}.txt", "a") as f:
-                        f.write(f"Queue size after put: {self.active_connections[correlation_id].sync_q.qsize()}\n")
-                        f.write(f"Event put successfully\n")
-                except Exception as debug_error:
-                    print(f"DEBUG: Failed to write send debug file: {debug_error}")
+                self._enqueue(self.active_connections[correlation_id], event)
                 
                 # Log the event
                 self.telemetry.log_event(
@@ -201,15 +134,6 @@ class StreamingService:
                 )
                 
             except Exception as e:
-                # File-based error debug output
-                try:
-                    with open(f"/tmp/streaming_send_{correlation_id[:8]}_error.txt", "w") as f:
-                        f.write(f"{time.time()}: send_event failed for {correlation_id}\n")
-                        f.write(f"Error: {str(e)}\n")
-                        f.write(f"Error type: {type(e).__name__}\n")
-                except Exception as debug_error:
-                    print(f"DEBUG: Failed to write send error debug file: {debug_error}")
-                
                 self.telemetry.log_error(
                     e,
                     context={
@@ -219,13 +143,12 @@ class StreamingService:
                     correlation_id=correlation_id
                 )
         else:
-            # File-based debug output for missing connection
-            try:
-                with open(f"/tmp/streaming_send_{correlation_id[:8]}_missing.txt", "w") as f:
-                    f.write(f"{time.time()}: send_event called but connection {correlation_id} not found\n")
-                    f.write(f"Active connections: {list(self.active_connections.keys())}\n")
-            except Exception as debug_error:
-                print(f"DEBUG: Failed to write missing connection debug file: {debug_error}")
+            self.telemetry.log_event(
+                "Event dropped - stream not found",
+                correlation_id=correlation_id,
+                event_type=event.type,
+                level="debug"
+            )
     
     async def broadcast_event(self, event: StreamEvent) -> None:
         """
@@ -247,7 +170,7 @@ class StreamingService:
         if correlation_id in self.active_connections:
             try:
                 # Send termination signal
-                self.active_connections[correlation_id].sync_q.put(None)
+                self._enqueue(self.active_connections[correlation_id], None)
                 
                 self.telemetry.log_event(
                     "Stream closed",
@@ -261,6 +184,20 @@ class StreamingService:
                     correlation_id=correlation_id
                 )
     
+    @staticmethod
+    def _enqueue(queue: asyncio.Queue, item: Optional[StreamEvent]) -> None:
+        """
+        Put an item on a stream queue without ever waiting on the client.
+        
+        Args:
+            queue: The connection's event queue
+            item: Event to deliver, or None to terminate the stream
+        """
+        if queue.full():
+            # The client is not draining the stream; drop the oldest event rather than stall the workflow
+            queue.get_nowait()
+        queue.put_nowait(item)
+    
     def _serialize_event(self, event: StreamEvent) -> str:
         """
         Serialize an event for Server-Sent Events format.
@@ -272,14 +209,19 @@ class StreamingService:
             Formatted SSE string
         """
         try:
-            event_dict = event.model_dump(exclude_none=True)
-            
-            # Convert datetime to ISO string
-            if "timestamp" in event_dict:
-                event_dict["timestamp"] = event_dict["timestamp"].isoformat()
+            if orjson is not None:
+                # StreamEvent is flat and orjson encodes its datetime timestamp and enum type
+                # natively, so the field values are encoded directly without a model_dump pass
+                event_dict = {key: value for key, value in vars(event).items() if value is not None}
+                data = orjson.dumps(event_dict, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+            else:
+                event_dict = event.model_dump(exclude_none=True)
+                # Convert datetime to ISO string
+                if "timestamp" in event_dict:
+                    event_dict["timestamp"] = event_dict["timestamp"].isoformat()
+                data = json.dumps(event_dict, default=str)
             
             # Format as SSE
-            data = json.dumps(event_dict, default=str)
             return f"data: {data}\n\n"
             
         except Exception as e:
@@ -291,6 +233,24 @@ class StreamingService:
             # Return a fallback SSE message
             return f"data: {{\"type\": \"error\", \"message\": \"Event serialization failed: {str(e)}\"}}\n\n"
     
+    def get_connection_info(self, correlation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get information about a single active connection.
+        
+        Args:
+            correlation_id: Stream identifier
+            
+        Returns:
+            Connection info, or None if the stream is not active
+        """
+        queue = self.active_connections.get(correlation_id)
+        if queue is None:
+            return None
+        return {
+            "queue_size": queue.qsize(),
+            "connected": True
+        }
+    
     def get_active_connections(self) -> Dict[str, Any]:
         """
         Get information about active connections.
@@ -300,7 +260,7 @@ class StreamingService:
         """
         return {
             correlation_id: {
-                "queue_size": queue.sync_q.qsize(),
+                "queue_size": queue.qsize(),
                 "connected": True
             }
             for correlation_id, queue in self.active_connections.items()
@@ -320,7 +280,7 @@ class StreamingService:
             message: AI message
             context: Additional context
         """
-        event = StreamEvent(
+        event = StreamEvent.model_construct(
             type=StreamEventType.AI_MESSAGE,
             message=message,
             correlation_id=correlation_id,
@@ -355,7 +315,7 @@ class StreamingService:
             "git": StreamEventType.TOOL_GIT,
         }
         
-        event = StreamEvent(
+        event = StreamEvent.model_construct(
             type=event_type_map.get(tool_type, StreamEventType.TOOL_BASH),
             command=command,
             output=output,
@@ -381,9 +341,9 @@ class StreamingService:
             step: Current step description
             context: Additional context
         """
-        event = StreamEvent(
+        event = StreamEvent.model_construct(
             type=StreamEventType.PROGRESS,
-            progress=progress,
+            progress=float(progress),
             step=step,
             correlation_id=correlation_id,
             context=context
@@ -406,7 +366,7 @@ class StreamingService:
             error_type: Error type
             context: Additional context
         """
-        event = StreamEvent(
+        event = StreamEvent.model_construct(
             type=StreamEventType.ERROR,
             error=error,
             error_type=error_type,
@@ -429,7 +389,7 @@ class StreamingService:
             message: Success message
             context: Additional context
         """
-        event = StreamEvent(
+        event = StreamEvent.model_construct(
             type=StreamEventType.SUCCESS,
             message=message,
             correlation_id=correlation_id,
@@ -131,6 +131,7 @@ class BackspaceLangGraphCLI:
             
             # Step 4: Cleanup
             self.print_status("Cleaning up...", "progress")
+            await self.agent.wait_for_cleanup()
             await self.agent.cleanup()
             self.print_progress(4, 5, "Cleanup complete")
             